@@ -22,7 +22,7 @@ import signal
 import unittest
 from datetime import datetime
 from time import sleep
-from unittest.mock import patch
+from unittest.mock import patch, mock_open, MagicMock
 from copy import deepcopy
 from tempfile import NamedTemporaryFile, TemporaryDirectory
 import pyfakefs.fake_filesystem_unittest as pyfakefs_ut
@@ -252,6 +252,21 @@ class TestTools(generic.TestCase):
         pid = self._create_process()
         self.assertEqual(tools.processName(pid), generic.DUMMY[:15])
 
+    def test_processInfo(self):
+        pid = self._create_process()
+        name, state = tools.processInfo(pid)
+        self.assertEqual(name, generic.DUMMY[:15])
+        self.assertNotEqual(state, 'T')
+        self.subproc.send_signal(signal.SIGSTOP)
+        sleep(0.01)
+        self.assertEqual(tools.processInfo(pid), (generic.DUMMY[:15], 'T'))
+
+    @patch('tools._readProcStat')
+    def test_processName_with_parentheses(self, mock_stat):
+        mock_stat.return_value = b'1234 (foo (bar) baz) T 1 1234 1234 0 -1\n'
+        self.assertEqual(tools.processName(1234), 'foo (bar) baz')
+        self.assertTrue(tools.processPaused(1234))
+
     def test_processCmdline(self):
         pid = self._create_process()
         self.assertRegex(tools.processCmdline(pid),
@@ -411,6 +426,19 @@ class TestTools(generic.TestCase):
         self.assertEqual(procArgs[1], '/proc')
         self.assertEqual(procArgs[2], 'proc')
 
+    @patch('tools.mountpoint', return_value='/mnt/with space\\x')
+    def test_mountArgs_escaped(self, mock_mp):
+        mtab = ('/dev/sda1 / ext4 rw 0 0\n'
+                '/dev/sdb1 /mnt/with\\040space ext4 rw 0 0\n'
+                '/dev/sdc1 /mnt/with\\040space\\134x vfat rw 0 0\n')
+
+        with patch('builtins.open', mock_open(read_data=mtab)):
+            args = tools.mountArgs('/mnt/with space\\x/foo')
+
+        self.assertEqual(
+            args,
+            ['/dev/sdc1', '/mnt/with space\\x', 'vfat', 'rw', '0', '0'])
+
     def test_isRoot(self):
         self.assertIsInstance(tools.isRoot(), bool)
 
@@ -622,6 +650,121 @@ class Environ(generic.TestCase):
                 self.assertEqual(test_env.strValue(k), str(i), msg)
 
 
+class FakeDBusException(Exception):
+    """Stand-in for ``dbus.exceptions.DBusException``."""
+
+    def __init__(self, name='org.freedesktop.DBus.Error.Failed'):
+        super().__init__(name)
+        self._dbus_error_name = name
+
+    def get_dbus_name(self):
+        return self._dbus_error_name
+
+
+def fakeDBus():
+    """Mocked ``dbus`` module raising `FakeDBusException`."""
+    fake = MagicMock()
+    fake.exceptions.DBusException = FakeDBusException
+    return fake
+
+
+class UPowerCall(generic.TestCase):
+    """Retry of UPower calls with a cached properties interface."""
+
+    def setUp(self):
+        super().setUp()
+
+        for patcher in (patch.object(tools, 'dbus', fakeDBus()),
+                        patch.object(tools, '_UPOWER_PROPERTIES', None),
+                        patch.object(tools, '_systemBus')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.bus = tools._systemBus.return_value
+
+    def test_no_retry_without_cached_interface(self):
+        self.bus.get_object.side_effect = FakeDBusException(
+            'org.freedesktop.DBus.Error.ServiceUnknown')
+
+        with self.assertRaises(FakeDBusException):
+            tools._upowerCall('Get', 'org.freedesktop.UPower', 'OnBattery')
+
+        self.assertEqual(self.bus.get_object.call_count, 1)
+        self.assertIsNone(tools._UPOWER_PROPERTIES)
+
+    def test_retry_with_cached_interface(self):
+        stale = MagicMock()
+        stale.Get.side_effect = FakeDBusException()
+        tools._UPOWER_PROPERTIES = stale
+        tools.dbus.Interface.return_value.Get.return_value = True
+
+        self.assertTrue(
+            tools._upowerCall('Get', 'org.freedesktop.UPower', 'OnBattery'))
+        self.assertEqual(self.bus.get_object.call_count, 1)
+        self.assertIs(tools._UPOWER_PROPERTIES,
+                      tools.dbus.Interface.return_value)
+
+
+class BusConnections(generic.TestCase):
+    """Cached D-Bus connections are dropped after they were lost."""
+
+    def setUp(self):
+        super().setUp()
+
+        patcher = patch.object(tools, 'dbus', fakeDBus())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        for func in (tools._systemBus, tools._busConnection):
+            func.cache_clear()
+            self.addCleanup(func.cache_clear)
+
+    def _failOn(self, lost_bus, name):
+        def func(bus):
+            if bus is lost_bus:
+                raise FakeDBusException(name)
+            return bus
+        return func
+
+    def test_system_bus_reconnect(self):
+        lost, new = MagicMock(), MagicMock()
+        tools.dbus.SystemBus.side_effect = [lost, new]
+        self.assertIs(tools._systemBus(), lost)
+
+        func = self._failOn(lost, 'org.freedesktop.DBus.Error.Disconnected')
+
+        self.assertIs(tools._onBus(tools._systemBus, func), new)
+        lost.close.assert_called_once()
+        self.assertIs(tools._systemBus(), new)
+
+    def test_session_bus_reconnect(self):
+        lost, new = MagicMock(), MagicMock()
+        lost.get_is_connected.return_value = False
+        tools.dbus.bus.BusConnection.side_effect = [lost, new]
+
+        func = self._failOn(lost, 'org.freedesktop.DBus.Error.ServiceUnknown')
+
+        with patch.dict(os.environ,
+                        {'DBUS_SESSION_BUS_ADDRESS': 'unix:path=/foo'}):
+            self.assertIs(tools._onBus(tools._sessionBus, func), new)
+            lost.close.assert_called_once()
+            self.assertIs(tools._sessionBus(), new)
+
+    def test_keep_connected_bus(self):
+        bus = MagicMock()
+        bus.get_is_connected.return_value = True
+        tools.dbus.SystemBus.return_value = bus
+
+        func = self._failOn(bus, 'org.freedesktop.DBus.Error.ServiceUnknown')
+
+        with self.assertRaises(FakeDBusException):
+            tools._onBus(tools._systemBus, func)
+
+        bus.close.assert_not_called()
+        self.assertEqual(tools.dbus.SystemBus.call_count, 1)
+        self.assertEqual(tools._systemBus.cache_info().currsize, 1)
+
+
 class ExecuteSubprocess(generic.TestCase):
     # new method with subprocess
     def test_returncode(self):
@@ -647,11 +790,88 @@ class ExecuteSubprocess(generic.TestCase):
         self.assertFalse(self.run)
         self.run = False
 
+    def test_callback_lines(self):
+        lines = []
+        tools.Execute(['printf', 'foo\\nbar\\n\\nbaz'],
+                      callback=lambda x, y: lines.append(x)).run()
+        self.assertListEqual(lines, ['foo', 'bar', 'baz'])
+
+        lines = []
+        tools.Execute(['printf', 'foo\\nbar\\n'],
+                      callback=lambda x, y: lines.append(x),
+                      conv_str=False).run()
+        self.assertListEqual(lines, [b'foo', b'bar'])
+
+        # invalid UTF-8
+        lines = []
+        tools.Execute(['printf', 'foo\\377\\nbar'],
+                      callback=lambda x, y: lines.append(x)).run()
+        self.assertListEqual(lines, ['foo\ufffd', 'bar'])
+
+    def test_filters(self):
+        lines = []
+        tools.Execute(['printf', 'foo\\nbar\\nbaz'],
+                      callback=lambda x, y: lines.append(x),
+                      filters=(str.upper,
+                               lambda x: '' if x == 'BAR' else x)).run()
+        self.assertListEqual(lines, ['FOO', 'BAZ'])
+
     def test_pausable(self):
         proc = tools.Execute(['true'])
         self.assertTrue(proc.pausable)
 
 
+class ExecuteSignalForwarding(generic.TestCase):
+    """Forwarding of SIGTSTP, SIGCONT and SIGHUP to the running command."""
+
+    def test_target_restored_if_popen_fails(self):
+        with self.assertRaises(FileNotFoundError):
+            tools.Execute(['nonExistingCommand']).run()
+
+        self.assertIsNone(tools._SIGNAL_FORWARD_TARGET)
+
+    def test_forward_to_running_command(self):
+        # The command sends SIGHUP to us which should kill the command
+        # instead of this process.
+        proc = tools.Execute(['sh', '-c', 'kill -HUP $PPID; sleep 10'])
+
+        self.assertEqual(proc.run(), -signal.SIGKILL)
+        self.assertIsNone(tools._SIGNAL_FORWARD_TARGET)
+
+    def test_previous_handler_if_idle(self):
+        tools._installSignalForwarding()
+        calls = []
+
+        with patch.dict(tools._SIGNAL_HANDLERS_BEFORE_FORWARDING,
+                        {signal.SIGHUP: lambda *args: calls.append(args)}):
+            signal.raise_signal(signal.SIGHUP)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0][0], signal.SIGHUP)
+
+    def test_default_action_if_idle(self):
+        # SIGHUP should terminate the process after a failed and a
+        # successful command like it does without forwarding.
+        script = (
+            'import os, signal, time, tools\n'
+            'try:\n'
+            '    tools.Execute(["nonExistingCommand"]).run()\n'
+            'except FileNotFoundError:\n'
+            '    pass\n'
+            'tools.Execute(["true"]).run()\n'
+            'os.kill(os.getpid(), signal.SIGHUP)\n'
+            'time.sleep(10)\n'
+        )
+        proc = subprocess.run(
+            [sys.executable, '-c', script],
+            cwd=os.path.dirname(os.path.abspath(tools.__file__)),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=30)
+
+        self.assertEqual(proc.returncode, -signal.SIGHUP)
+
+
 class Tools_FakeFS(pyfakefs_ut.TestCase):
     """Tests using a fake filesystem."""
 
@@ -691,6 +911,28 @@ class Tools_FakeFS(pyfakefs_ut.TestCase):
             }
         )
 
+    def test_git_repo_info_packed_refs(self):
+        """Simulate a git repo with the branch ref in packed-refs only"""
+
+        path = pathlib.Path('.git')
+        path.mkdir()
+
+        with (path / 'packed-refs').open('w') as handle:
+            handle.write('# pack-refs with: peeled fully-peeled sorted\n'
+                         '98765 refs/heads/dev\n'
+                         '01234 refs/heads/fix/foobar\n')
+
+        with (path / 'HEAD').open('w') as handle:
+            handle.write('ref: refs/heads/fix/foobar\n')
+
+        self.assertEqual(
+            tools.get_git_repository_info(hash_length=3),
+            {
+                'hash': '012',
+                'branch': 'fix/foobar'
+            }
+        )
+
 
 class ValidateSnapshotsPath(generic.TestCaseCfg):
     def test_writes(self):
@@ -824,3 +1066,27 @@ class OlderThan(unittest.TestCase):
         mock_dt.now.return_value = datetime(1983, 3, 6, 18, 23, 0, 1)
 
         self.assertTrue(tools.older_than(birth, 7, TimeUnit.MONTH))
+
+    def test_month_into_december(self, mock_dt):
+        """Target month is December."""
+        birth = datetime(1982, 11, 6, 18, 23, 0, 0)
+        mock_dt.now.return_value = datetime(1982, 12, 6, 18, 23, 0, 1)
+
+        self.assertTrue(tools.older_than(birth, 1, TimeUnit.MONTH))
+
+    def test_month_years_older(self, mock_dt):
+        """Far older than the months given."""
+        birth = datetime(1982, 8, 6, 18, 23, 0, 0)
+        mock_dt.now.return_value = datetime(1990, 1, 1, 0, 0, 0, 0)
+
+        self.assertTrue(tools.older_than(birth, 2, TimeUnit.MONTH))
+
+    def test_explicit_now(self, mock_dt):
+        """Compare against a given timestamp instead of the current time."""
+        birth = datetime(1982, 8, 6, 18, 23, 0, 0)
+        mock_dt.now.return_value = datetime(1982, 8, 6, 18, 23, 0, 0)
+        now = datetime(1982, 8, 8, 18, 23, 0, 1)
+
+        self.assertTrue(tools.older_than(birth, 2, TimeUnit.DAY, now=now))
+        self.assertTrue(tools.older_than(birth, 2, TimeUnit.MONTH,
+                                         now=datetime(1982, 10, 7)))
@@ -17,14 +17,22 @@ import sys
 import pathlib
 import subprocess
 import shlex
+import shutil
 import signal
 import re
+import select
 import errno
 import gzip
 import locale
+import calendar
+import collections
 import gettext
+import glob
 import hashlib
+import time
+import types
 import ipaddress
+import functools
 from datetime import datetime, timedelta
 from packaging.version import Version
 from typing import Union
@@ -87,6 +95,7 @@ DISK_BY_UUID = '/dev/disk/by-uuid'
 # |-----------------|
 
 
+@functools.lru_cache(maxsize=None)
 def sharePath():
     """Get path where Back In Time is installed.
 
@@ -99,6 +108,8 @@ def sharePath():
         /usr/local/share
         /opt/usr/share
 
+    The result is cached because ``__file__`` does not change at runtime.
+
     Returns:
         str: Share path.
     """
@@ -112,6 +123,7 @@ def sharePath():
     return '/usr/share'
 
 
+@functools.lru_cache(maxsize=None)
 def backintimePath(*path):
     """
     Get path inside ``backintime`` install folder.
@@ -129,8 +141,6 @@ def backintimePath(*path):
 def docPath():
     """Not sure what this path is about.
     """
-    path = pathlib.Path(sharePath()) / 'doc' / 'backintime-common'
-
     # Dev note (buhtz, aryoda, 2024-02):
     # This piece of code originally resisted in Config.__init__() and was
     # introduced by Dan in 2008. The reason for the existence of this "if"
@@ -143,18 +153,17 @@ def docPath():
     # b) or a left-over from old code where the LICENSE was installed
     # differently...
 
-    license_file = pathlib.Path(backintimePath()) / 'LICENSE'
-    if license_file.exists():
-        path = backintimePath()
+    if os.path.exists(os.path.join(backintimePath(), 'LICENSE')):
+        return backintimePath()
 
-    return str(path)
+    return os.path.join(sharePath(), 'doc', 'backintime-common')
 
 
 # |---------------------------------------------------|
 # | Internationalization (i18n) & localization (L10n) |
 # |---------------------------------------------------|
 _GETTEXT_DOMAIN = 'backintime'
-_GETTEXT_LOCALE_DIR = pathlib.Path(sharePath()) / 'locale'
+_GETTEXT_LOCALE_DIR = os.path.join(sharePath(), 'locale')
 
 
 def _determine_current_used_language_code(translation, language_code):
@@ -194,11 +203,10 @@ def _determine_current_used_language_code(translation, language_code):
 
         # Extract the language code form that path
         if mo_file_path:
-            mo_file_path = pathlib.Path(mo_file_path)
             # e.g /usr/share/locale/de/LC_MESSAGES/backintime.mo
             #                       ^^
-            current_used_language_code = mo_file_path.relative_to(
-                _GETTEXT_LOCALE_DIR).parts[0]
+            current_used_language_code = mo_file_path[
+                len(_GETTEXT_LOCALE_DIR) + 1:].split(os.sep, 1)[0]
 
         else:
             # Workaround: Happens when LC_ALL=C, which in BIT context mean
@@ -208,6 +216,28 @@ def _determine_current_used_language_code(translation, language_code):
     return current_used_language_code
 
 
+@functools.lru_cache(maxsize=8)
+def _load_translation(language_code):
+    """Load the GNU gettext translation for a specific language code.
+
+    The result is cached to avoid searching and parsing the mo-files each
+    time the translation is (re)initiated.
+
+    Args:
+        language_code(str): Language code to use (based on ISO-639) or
+            ``None`` for the systems current locale.
+
+    Returns:
+        gettext.NullTranslations: The translation object.
+    """
+    return gettext.translation(
+        domain=_GETTEXT_DOMAIN,
+        localedir=_GETTEXT_LOCALE_DIR,
+        languages=[language_code, ] if language_code else None,
+        fallback=True
+    )
+
+
 def initiate_translation(language_code):
     """Initiate Class-based API of GNU gettext.
 
@@ -225,12 +255,7 @@ def initiate_translation(language_code):
     else:
         logger.debug('No language code. Use systems current locale.')
 
-    translation = gettext.translation(
-        domain=_GETTEXT_DOMAIN,
-        localedir=_GETTEXT_LOCALE_DIR,
-        languages=[language_code, ] if language_code else None,
-        fallback=True
-    )
+    translation = _load_translation(language_code)
     translation.install(names=['ngettext'])
 
     used_code = _determine_current_used_language_code(
@@ -241,6 +266,25 @@ def initiate_translation(language_code):
     return used_code
 
 
+@functools.lru_cache(maxsize=None)
+def _locale_code_by_language_code(language_code: str) -> str:
+    """Determine the normalized locale code (e.g. ``de_DE.UTF-8``) by
+    language code (e.g. ``de``).
+
+    The result is cached because `locale.normalize()` has to walk through
+    its big alias tables.
+    """
+
+    # "de" -> "de_DE.ISO8859-1" -> "de_DE"
+    code = locale.normalize(language_code).split('.')[0]
+
+    try:
+        # "de_DE" -> "de_DE.UTF-8"
+        return code + '.' + locale.getencoding()
+    except AttributeError:  # Python 3.10 or older
+        return code + '.' + locale.getpreferredencoding()
+
+
 def set_lc_time_by_language_code(language_code: str):
     """Set ``LC_TIME`` based on a specific language code.
 
@@ -259,17 +303,7 @@ def set_lc_time_by_language_code(language_code: str):
     on the language code. A warning is logged if it is not possible.
     """
 
-    # Determine the normalized locale code (e.g. "de_DE.UTF-8") by
-    # language code (e.g. "de").
-
-    # "de" -> "de_DE.ISO8859-1" -> "de_DE"
-    code = locale.normalize(language_code).split('.')[0]
-
-    try:
-        # "de_DE" -> "de_DE.UTF-8"
-        code = code + '.' + locale.getencoding()
-    except AttributeError:  # Python 3.10 or older
-        code = code + '.' + locale.getpreferredencoding()
+    code = _locale_code_by_language_code(language_code)
 
     try:
         # logger.debug(f'Try to set locale.LC_TIME to "{code}" based on '
@@ -285,43 +319,34 @@ def set_lc_time_by_language_code(language_code: str):
             f'application. Used locale is "{locale.getlocale()}".')
 
 
+@functools.lru_cache(maxsize=1)
 def get_available_language_codes():
     """Return language codes available in the current installation.
 
     The filesystem is searched for ``backintime.mo`` files and the language
-    code is extracted from the full path of that files.
+    code is extracted from the full path of that files. The result is cached
+    because the installed languages do not change at runtime.
 
     Return:
-        List of language codes.
+        Tuple of language codes.
     """
 
-    # full path of one mo-file
-    # e.g. /usr/share/locale/de/LC_MESSAGES/backintime.mo
-    mo = gettext.find(domain=_GETTEXT_DOMAIN, localedir=_GETTEXT_LOCALE_DIR)
+    # e.g. /usr/share/locale/*/LC_MESSAGES/backintime.mo
+    pattern = os.path.join(
+        _GETTEXT_LOCALE_DIR, '*', 'LC_MESSAGES', f'{_GETTEXT_DOMAIN}.mo')
 
-    if mo:
-        mo = pathlib.Path(mo)
-    else:
-        # Workaround. This happens if LC_ALL=C and BIT don't use an explicit
-        # language. Should be re-design.
-        mo = _GETTEXT_LOCALE_DIR / 'xy' / 'LC_MESSAGES' / 'backintime.mo'
-
-    # e.g. de/LC_MESSAGES/backintime.mo
-    mo = mo.relative_to(_GETTEXT_LOCALE_DIR)
-
-    # e.g. */LC_MESSAGES/backintime.mo
-    mo = pathlib.Path('*') / pathlib.Path(*mo.parts[1:])
-
-    mofiles = _GETTEXT_LOCALE_DIR.rglob(str(mo))
-
-    return [p.relative_to(_GETTEXT_LOCALE_DIR).parts[0] for p in mofiles]
+    # e.g. /usr/share/locale/de/LC_MESSAGES/backintime.mo
+    #                        ^^
+    return tuple(mo.split(os.sep)[-3] for mo in glob.glob(pattern))
 
 
+@functools.lru_cache(maxsize=32)
 def get_language_names(language_code):
     """Return a list with language names in three different flavors.
 
     Language codes from `get_available_language_codes()` are combined with
-    `languages.language_names` to prepare the list.
+    `languages.language_names` to prepare the list. The result is cached per
+    language code and shared between callers, so do not modify it.
 
     Args:
         language_code (str): Usually the current language used by Back In Time.
@@ -334,34 +359,23 @@ def get_language_names(language_code):
         e.g. ``ja`` (Japanese) for ``de`` (German) locale
         is ``('Japanisch', '日本語', 'Japanese')``.
     """
-    result = {}
-    codes = ['en'] + get_available_language_codes()
-
-    for c in codes:
-
-        try:
-            # A dict with one specific language and how its name is
-            # represented in all other languages.
-            # e.g. "Japanese" in "de" is "Japanisch"
-            # e.g. "Deutsch" in "es" is "alemán"
-            lang = languages.names[c]
-
-        except KeyError:
-            names = None
-
-        else:
-            names = (
-                # in currents locale language
-                lang[language_code],
-                # native
-                lang['_native'],
-                # in English (source language)
-                lang['en']
-            )
-
-        result[c] = names
-
-    return result
+    # A dict with one specific language and how its name is
+    # represented in all other languages.
+    # e.g. "Japanese" in "de" is "Japanisch"
+    # e.g. "Deutsch" in "es" is "alemán"
+    get_names = languages.names.get
+
+    return {
+        c: (
+            # in currents locale language
+            lang[language_code],
+            # native
+            lang['_native'],
+            # in English (source language)
+            lang['en']
+        ) if (lang := get_names(c)) else None
+        for c in ('en', ) + get_available_language_codes()
+    }
 
 
 def get_native_language_and_completeness(language_code):
@@ -417,25 +431,25 @@ def validate_and_prepare_snapshots_path(
 
     Returns: Success (`True`) or failure (`False`).
     """
-    path = pathlib.Path(path)
+    path = os.fspath(path)
 
-    if not path.is_dir():
+    if not os.path.isdir(path):
         error_handler(_('Invalid option. {path} is not a folder.')
                       .format(path=path))
         return False
 
     # build full path
     # <path>/backintime/<host>/<user>/<profile_id>
-    full_path = pathlib.Path(path, 'backintime', *host_user_profile)
+    full_path = os.path.join(path, 'backintime', *host_user_profile)
 
     # create full_path
     try:
-        full_path.mkdir(mode=0o777, parents=True, exist_ok=True)
+        os.makedirs(full_path, mode=0o777, exist_ok=True)
 
     except PermissionError:
         error_handler('\n'.join([
             _('Creation of following folder failed:'),
-            str(full_path),
+            full_path,
             _(f'Write access may be restricted.')]))
         return False
 
@@ -470,7 +484,7 @@ def is_filesystem_valid(full_path, msg_path, mode, copy_links):
             msg string.
 
     """
-    fs = filesystem(full_path if isinstance(full_path, str) else str(full_path))
+    fs = filesystem(os.fspath(full_path))
 
     msg = None
 
@@ -516,27 +530,23 @@ def is_writeable(folder):
             msg string.
     """
 
-    folder = pathlib.Path(folder)
+    folder = os.fspath(folder)
 
-    check_path = folder / 'check'
+    check_path = os.path.join(folder, 'check')
 
     try:
-        check_path.mkdir(
-            # Do not create parent folders
-            parents=False,
-            # Raise error if exists
-            exist_ok=False
-        )
+        # Do not create parent folders and raise error if exists
+        os.mkdir(check_path)
 
     except PermissionError:
         msg = '\n'.join([
             _('File creation failed in this folder:'),
-            str(folder),
+            folder,
             _('Write access may be restricted.')])
         return False, msg
 
     else:
-        check_path.rmdir()
+        os.rmdir(check_path)
 
     return True, None
 
@@ -562,6 +572,7 @@ def registerBackintimePath(*path):
         sys.path.insert(0, path)
 
 
+@functools.lru_cache(maxsize=None)
 def runningFromSource():
     """Check if BackInTime is running from source (without installing).
 
@@ -576,14 +587,28 @@ def runningFromSource():
     return os.path.isfile(backintimePath('common', 'backintime'))
 
 
+# Value of 'PATH' after the last call of addSourceToPathEnviron()
+_PATH_WITH_SOURCE = None
+
 def addSourceToPathEnviron():
     """
     Add 'backintime/common' path to 'PATH' environ variable.
+
+    Repeated calls return immediately as long as 'PATH' was not modified
+    in the meantime.
     """
-    source = backintimePath('common')
+    global _PATH_WITH_SOURCE
+
     path = os.getenv('PATH')
+    if path is not None and path == _PATH_WITH_SOURCE:
+        return
+
+    source = backintimePath('common')
     if path and source not in path.split(':'):
-        os.environ['PATH'] = '%s:%s' % (source, path)
+        path = '%s:%s' % (source, path)
+        os.environ['PATH'] = path
+
+    _PATH_WITH_SOURCE = path
 
 
 def get_git_repository_info(path=None, hash_length=None):
@@ -595,7 +620,7 @@ def get_git_repository_info(path=None, hash_length=None):
     Credits: https://stackoverflow.com/a/51224861/4865723
 
     Args:
-        path (Path): Path with '.git' folder in (default is
+        path (str, Path): Path with '.git' folder in (default is
                      current working directory).
         cut_hash (int): Restrict length of commit hash.
 
@@ -604,35 +629,42 @@ def get_git_repository_info(path=None, hash_length=None):
                 otherwise an `None`.
     """
 
-    if not path:
-        # Default is current working dir
-        path = pathlib.Path.cwd()
-    elif isinstance(path, str):
-        # WORKAROUND until cmoplete migration to pathlib
-        path = pathlib.Path(path)
-
-    git_folder = path / '.git'
+    # Default is current working dir
+    git_folder = os.path.join(os.fspath(path) if path else os.getcwd(), '.git')
 
-    if not git_folder.exists():
+    if not os.path.exists(git_folder):
         return None
 
     result = {}
 
     # branch name
-    with (git_folder / 'HEAD').open('r') as handle:
-        val = handle.read()
+    with open(os.path.join(git_folder, 'HEAD'), 'rb') as handle:
+        val = handle.read().strip()
 
-    if not val.startswith('ref: '):
+    if not val.startswith(b'ref: '):
         result['branch'] = '(detached HEAD)'
-        result['hash'] = val
+        result['hash'] = val.decode()
 
     else:
-        result['branch'] = '/'.join(val.split('/')[2:]).strip()
+        # e.g. "ref: refs/heads/fix/foobar"
+        ref = val[5:]
+        result['branch'] = b'/'.join(ref.split(b'/')[2:]).decode()
 
         # commit hash
-        with (git_folder / 'refs' / 'heads' / result['branch']) \
-            .open('r') as handle:
-            result['hash'] = handle.read().strip()
+        try:
+            with open(os.path.join(git_folder, ref.decode()), 'rb') as handle:
+                result['hash'] = handle.read().strip().decode()
+
+        except FileNotFoundError:
+            # The ref might be stored in "packed-refs" only, e.g. after
+            # "git gc" or a fresh clone. Lines look like "<hash> <ref>".
+            result['hash'] = ''
+            with open(os.path.join(git_folder, 'packed-refs'), 'rb') as handle:
+                for line in handle:
+                    commit, _sep, name = line.strip().partition(b' ')
+                    if name == ref:
+                        result['hash'] = commit.decode()
+                        break
 
     if hash_length:
         result['hash'] = result['hash'][:hash_length]
@@ -654,23 +686,17 @@ def readFile(path, default=None):
     Returns:
         str:                    content of file in ``path``
     """
-    ret_val = default
-
     try:
-        if os.path.exists(path):
-
+        try:
             with open(path) as f:
-                ret_val = f.read()
-
-        elif os.path.exists(path + '.gz'):
+                return f.read()
 
+        except FileNotFoundError:
             with gzip.open(path + '.gz', 'rt') as f:
-                ret_val = f.read()
+                return f.read()
 
     except:
-        pass
-
-    return ret_val
+        return default
 
 
 def readFileLines(path, default = None):
@@ -687,22 +713,40 @@ def readFileLines(path, default = None):
     Returns:
         list:                   content of file in ``path`` split by lines.
     """
-    ret_val = default
+    content = readFile(path)
 
-    try:
-        if os.path.exists(path):
-            with open(path) as f:
-                ret_val = [x.rstrip('\n') for x in f.readlines()]
-        elif os.path.exists(path + '.gz'):
-            with gzip.open(path + '.gz', 'rt') as f:
-                ret_val = [x.rstrip('\n') for x in f.readlines()]
-    except:
-        pass
+    if content is None:
+        return default
+
+    return _splitLines(content)
+
+
+def _splitLines(content):
+    """Split ``content`` by newlines dropping a trailing newline.
+
+    ``str.splitlines()`` is not used because it would also split at other
+    characters (e.g. form feed) that may be part of file names.
+    """
+    lines = content.split('\n')
+
+    if not lines[-1]:
+        lines.pop()
+
+    return lines
 
-    return ret_val
 
+# Length of one unit for units supported by timedelta
+_TIMEDELTA_BY_UNIT = {
+    TimeUnit.HOUR: timedelta(hours=1),
+    TimeUnit.DAY: timedelta(days=1),
+    TimeUnit.WEEK: timedelta(weeks=1),
+}
 
-def older_than(dt: datetime, value: int, unit: TimeUnit) -> bool:
+
+def older_than(dt: datetime,
+               value: int,
+               unit: TimeUnit,
+               now: datetime = None) -> bool:
     """Return ``True`` if ``dt`` is older than ``value`` months, weeks, days or
     hours compared to the current time (`datetime.now()`).
 
@@ -713,6 +757,8 @@ def older_than(dt: datetime, value: int, unit: TimeUnit) -> bool:
         dt: Timestamp to be compared with on microsecond level.
         value: Number of units.
         unit: Specify to treat ``value`` as hours, days, weeks or months.
+        now: Timestamp to compare with instead of the current time. Useful
+            to compare multiple timestamps against the same point in time.
 
     Return:
         ``True`` if older, otherwise ``False``.
@@ -720,16 +766,8 @@ def older_than(dt: datetime, value: int, unit: TimeUnit) -> bool:
     if not isinstance(unit, TimeUnit):
         unit = TimeUnit(unit)
 
-    now = datetime.now()
-
-    if unit is TimeUnit.HOUR:
-        return dt < now - timedelta(hours=value)
-
-    if unit is TimeUnit.DAY:
-        return dt < now - timedelta(days=value)
-
-    if unit is TimeUnit.WEEK:
-        return dt < now - timedelta(weeks=value)
+    if now is None:
+        now = datetime.now()
 
     if unit is TimeUnit.MONTH:
         # Calculate months based on calendar because timedelta do not support
@@ -737,22 +775,17 @@ def older_than(dt: datetime, value: int, unit: TimeUnit) -> bool:
         compare_month = (dt.month + value - 1) % 12 + 1
         compare_year = dt.year + (dt.month + value - 1) // 12
         # make sure that day exist in the month
-        last_day_dt \
-            = datetime(compare_year, compare_month + 1, 1) - timedelta(days=1)
-        compare_day = min(dt.day, last_day_dt.day)
+        compare_day = min(
+            dt.day, calendar.monthrange(compare_year, compare_month)[1])
 
-        compare_dt = datetime(
-            compare_year, compare_month, compare_day,
-            now.hour, now.minute, now.microsecond)
+        compare_dt = dt.replace(
+            year=compare_year, month=compare_month, day=compare_day)
 
-        return now < compare_dt
+        return compare_dt < now
 
-    # Dev note (buhtz, 2024-09): This code branch already existed in the
-    # original code (but silent, without throwing an exception). Even if it may
-    # seem (nearly) pointless, it will be kept for now to ensure that it is
-    # never executed.
-    raise RuntimeError(f'Unexpected situation. {dt=} {value=} {unit=} '
-                       'Please report it via a bug ticket.')
+    # Hours, days and weeks. An unknown unit was already rejected by
+    # TimeUnit() above.
+    return dt < now - value * _TIMEDELTA_BY_UNIT[unit]
 
 
 def checkCommand(cmd):
@@ -772,6 +805,21 @@ def checkCommand(cmd):
     if os.path.isfile(cmd):
         return True
 
+    return _commandInPath(cmd, os.getenv('PATH', ''))
+
+
+@functools.lru_cache(maxsize=64)
+def _commandInPath(cmd, path_environ):
+    """Cached lookup of ``cmd`` for :py:func:`checkCommand`.
+
+    Args:
+        cmd (str): The command.
+        path_environ (str): Current value of 'PATH'. Only used as cache key
+            so the lookup is repeated when 'PATH' changes.
+
+    Returns:
+        bool: ``True`` if ``cmd`` is in 'PATH' environment otherwise ``False``.
+    """
     return which(cmd) is not None
 
 
@@ -791,20 +839,15 @@ def which(cmd):
         str: Fullpath of command ``cmd`` or ``None`` if command is not
              available.
     """
-    pathenv = os.getenv('PATH', '')
-    path = pathenv.split(':')
-    common = backintimePath('common')
+    path = os.getenv('PATH', '')
 
-    if runningFromSource() and common not in path:
-        path.insert(0, common)
+    if runningFromSource():
+        common = backintimePath('common')
 
-    for directory in path:
-        fullpath = os.path.join(directory, cmd)
+        if common not in path.split(os.pathsep):
+            path = common + os.pathsep + path
 
-        if os.path.isfile(fullpath) and os.access(fullpath, os.X_OK):
-            return fullpath
-
-    return None
+    return shutil.which(cmd, path=path)
 
 
 def makeDirs(path):
@@ -821,18 +864,15 @@ def makeDirs(path):
     if not path:
         return False
 
-    if os.path.isdir(path):
-        return True
-
-    else:
+    try:
+        os.makedirs(path, exist_ok=True)
 
-        try:
-            os.makedirs(path)
-        except Exception as e:
-            logger.error("Failed to make dirs '%s': %s"
-                         % (path, str(e)), traceDepth=1)
+    except Exception as e:
+        logger.error("Failed to make dirs '%s': %s"
+                     % (path, str(e)), traceDepth=1)
+        return False
 
-    return os.path.isdir(path)
+    return True
 
 
 def mkdir(path, mode=0o755, enforce_permissions=True):
@@ -846,7 +886,13 @@ def mkdir(path, mode=0o755, enforce_permissions=True):
     Returns:
         bool:       ``True`` if successful
     """
-    if os.path.isdir(path):
+    try:
+        os.mkdir(path, mode)
+
+    except FileExistsError:
+        if not os.path.isdir(path):
+            raise
+
         try:
             if enforce_permissions:
                 os.chmod(path, mode)
@@ -855,16 +901,26 @@ def mkdir(path, mode=0o755, enforce_permissions=True):
 
         return True
 
-    else:
-        os.mkdir(path, mode)
+    if mode & 0o002 == 0o002:
+        # make file world (other) writable was requested
+        # debian and ubuntu won't set o+w with os.mkdir
+        # this will fix it
+        os.chmod(path, mode)
 
-        if mode & 0o002 == 0o002:
-            # make file world (other) writable was requested
-            # debian and ubuntu won't set o+w with os.mkdir
-            # this will fix it
-            os.chmod(path, mode)
+    return True
 
-    return os.path.isdir(path)
+
+def _iterPids():
+    """
+    Yield all PIDs currently running on the system.
+
+    Yields:
+        int:    PID
+    """
+    with os.scandir('/proc') as it:
+        for entry in it:
+            if entry.name.isdigit():
+                yield int(entry.name)
 
 
 def pids():
@@ -874,27 +930,67 @@ def pids():
     Returns:
         list:   PIDs as int
     """
-    return [int(x) for x in os.listdir('/proc') if x.isdigit()]
+    return list(_iterPids())
 
 
-def processStat(pid):
+def _readProcStat(pid):
     """
-    Get the stat's of the process with ``pid``.
+    Get the raw stat's of the process with ``pid``.
 
     Args:
         pid (int):  Process Indicator
 
     Returns:
-        str:        stat from /proc/PID/stat
+        bytes:      stat from /proc/PID/stat
     """
     try:
-        with open('/proc/{}/stat'.format(pid), 'rt') as f:
+        with open('/proc/{}/stat'.format(pid), 'rb') as f:
             return f.read()
 
     except OSError as e:
         logger.warning('Failed to read process stat from {}: [{}] {}'
                        .format(e.filename, e.errno, e.strerror))
-        return ''
+        return b''
+
+
+def processStat(pid):
+    """
+    Get the stat's of the process with ``pid``.
+
+    Args:
+        pid (int):  Process Indicator
+
+    Returns:
+        str:        stat from /proc/PID/stat
+    """
+    return _readProcStat(pid).decode()
+
+
+def processInfo(pid):
+    """
+    Get the name and the state of the process with ``pid`` reading
+    /proc/PID/stat only once.
+
+    Args:
+        pid (int):  Process Indicator
+
+    Returns:
+        tuple:      name (str) and state (str) of the process (e.g.
+                    ``('backintime', 'S')``) or ``(None, None)`` if the stat
+                    couldn't be read
+    """
+    stat = _readProcStat(pid)
+
+    # The name is enclosed by the first "(" and the last ")" and can contain
+    # spaces and parentheses itself. The state follows the name,
+    # e.g. "1234 (foo (bar)) S ..."
+    l = stat.find(b'(')
+    r = stat.rfind(b')')
+
+    if not 0 <= l < r:
+        return (None, None)
+
+    return (stat[l + 1:r].decode(), stat[r + 2:r + 3].decode())
 
 
 def processPaused(pid):
@@ -907,9 +1003,7 @@ def processPaused(pid):
     Returns:
         bool:       True if process is paused
     """
-    m = re.match(r'\d+ \(.+\) T', processStat(pid))
-
-    return bool(m)
+    return processInfo(pid)[1] == 'T'
 
 
 def processName(pid):
@@ -922,10 +1016,7 @@ def processName(pid):
     Returns:
         str:        name of the process
     """
-    m = re.match(r'.*\((.+)\).*', processStat(pid))
-
-    if m:
-        return m.group(1)
+    return processInfo(pid)[0]
 
 
 def processCmdline(pid):
@@ -946,6 +1037,31 @@ def processCmdline(pid):
         logger.warning('Failed to read process cmdline from {}: [{}] {}'.format(e.filename, e.errno, e.strerror))
         return ''
 
+def _iterPidsWithName(name):
+    """
+    Yield PIDs of all processes currently running with name ``name``.
+
+    Args:
+        name (str): name of a process like 'python3' or 'backintime'
+
+    Yields:
+        int:        PID
+    """
+    # /proc/###/comm stores just the first 15 chars of the process name
+    # followed by a newline
+    target = (name[:15] + '\n').encode()
+
+    for pid in _iterPids():
+        try:
+            with open('/proc/{}/comm'.format(pid), 'rb') as f:
+                if f.read() == target:
+                    yield pid
+
+        except OSError:
+            # process vanished in the meantime
+            pass
+
+
 def pidsWithName(name):
     """
     Get all processes currently running with name ``name``.
@@ -956,20 +1072,41 @@ def pidsWithName(name):
     Returns:
         list:       PIDs as int
     """
-    # /proc/###/stat stores just the first 16 chars of the process name
-    return [x for x in pids() if processName(x) == name[:15]]
+    return list(_iterPidsWithName(name))
+
+# Seconds a result of processExists() is reused
+_PROCESS_EXISTS_TTL = 0.2
+# Results of processExists() indexed by process name as
+# tuples (result, monotonic timestamp)
+_PROCESS_EXISTS_CACHE = {}
 
 def processExists(name):
     """
     Check if process ``name`` is currently running.
 
+    The result is cached for a fraction of a second to keep frequent polling
+    cheap because each check walks through all PIDs in /proc.
+
     Args:
         name (str): name of a process like 'python3' or 'backintime'
 
     Returns:
         bool:       ``True`` if there is a process running with ``name``
     """
-    return len(pidsWithName(name)) > 0
+    now = time.monotonic()
+
+    try:
+        result, timestamp = _PROCESS_EXISTS_CACHE[name]
+        if now - timestamp < _PROCESS_EXISTS_TTL:
+            return result
+    except KeyError:
+        pass
+
+    # stop at the first process found
+    result = next(_iterPidsWithName(name), None) is not None
+    _PROCESS_EXISTS_CACHE[name] = (result, now)
+
+    return result
 
 def processAlive(pid):
     """
@@ -1029,6 +1166,58 @@ def checkXServer():
         return False
 
 
+def _readProcessOutput(proc, timeout):
+    """
+    Collect stdout and stderr of ``proc`` until both pipes are closed and
+    the process has terminated.
+
+    Unlike ``Popen.communicate(timeout=...)`` this returns as soon as the
+    process is gone instead of polling for its exit code in growing sleep
+    intervals.
+
+    Args:
+        proc (subprocess.Popen):    process started with both ``stdout`` and
+                                    ``stderr`` set to ``subprocess.PIPE``
+        timeout (float):            seconds to wait at most
+
+    Returns:
+        tuple:  stdout and stderr as ``str``
+
+    Raises:
+        subprocess.TimeoutExpired:  if ``proc`` is still running after
+                                    ``timeout`` seconds. ``proc`` is killed
+                                    and the output read so far is attached.
+    """
+    deadline = time.monotonic() + timeout
+    buffers = {proc.stdout.fileno(): bytearray(),
+               proc.stderr.fileno(): bytearray()}
+    open_fds = list(buffers)
+
+    while open_fds:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            # Kill it here, "with Popen()" would wait for it forever
+            proc.kill()
+            out, err = (bytes(buf).decode(errors='replace')
+                        for buf in buffers.values())
+            raise subprocess.TimeoutExpired(proc.args, timeout,
+                                            output=out, stderr=err)
+
+        readable, _, _ = select.select(open_fds, [], [], min(remaining, 0.05))
+        for fd in readable:
+            chunk = os.read(fd, 32768)
+            if chunk:
+                buffers[fd] += chunk
+            else:
+                open_fds.remove(fd)
+
+    # Both pipes are closed, so the process is about to exit or already did
+    proc.wait(timeout=max(deadline - time.monotonic(), 0))
+
+    return tuple(bytes(buf).decode(errors='replace')
+                 for buf in buffers.values())
+
+
 def is_Qt_working(systray_required=False):
     """
     Check if the Qt GUI library is working (installed and configured)
@@ -1048,6 +1237,15 @@ def is_Qt_working(systray_required=False):
                         if ``systray_required`` is ``True``)
     """
 
+    # Without a display (e.g. cron jobs or a headless root session) Qt can't
+    # create a GUI. No need to start the probing process then. Unless a
+    # platform plugin like "offscreen" was explicitly requested.
+    if not (os.environ.get('DISPLAY')
+            or os.environ.get('WAYLAND_DISPLAY')
+            or os.environ.get('QT_QPA_PLATFORM')):
+        logger.debug("No display available. Qt probing skipped.")
+        return False
+
     # Spawns a new process since it may crash with a SIGABRT and we
     # don't want to crash BiT if this happens...
 
@@ -1059,10 +1257,9 @@ def is_Qt_working(systray_required=False):
 
         with subprocess.Popen(cmd,
                               stdout=subprocess.PIPE,
-                              stderr=subprocess.PIPE,
-                              universal_newlines=True) as proc:
+                              stderr=subprocess.PIPE) as proc:
 
-            std_output, error_output = proc.communicate(timeout=30)  # to get the exit code
+            std_output, error_output = _readProcessOutput(proc, timeout=30)  # to get the exit code
             # "timeout" fixes #1592 (qt_probing.py may hang as root): Kill after timeout
 
             logger.debug(f"Qt probing result: exit code {proc.returncode}")
@@ -1078,12 +1275,12 @@ def is_Qt_working(systray_required=False):
         raise
 
     # Fix for #1592 (qt_probing.py may hang as root): Kill after timeout
-    except subprocess.TimeoutExpired:
+    except subprocess.TimeoutExpired as e:
         proc.kill()
-        outs, errs = proc.communicate()
+        proc.wait()
         logger.info("Qt probing sub process killed after timeout without response")
-        logger.debug(f"Qt probing stdout:\n{outs}")
-        logger.debug(f"Qt probing errout:\n{errs}")
+        logger.debug(f"Qt probing stdout:\n{e.output}")
+        logger.debug(f"Qt probing errout:\n{e.stderr}")
 
     except Exception as e:
         logger.error(f"Error: {repr(e)}")
@@ -1100,9 +1297,184 @@ def preparePath(path):
     Returns:
         str:        path ``path`` without trailing but with leading slash
     """
-    path = path.strip("/")
-    path = os.sep + path
-    return path
+    # Nothing to do for already prepared paths (the common case)
+    if (path.startswith(os.sep)
+            and not path.startswith(os.sep * 2)
+            and not path.endswith(os.sep)):
+        return path
+
+    return os.sep + path.strip("/")
+
+
+def _sessionBus():
+    """
+    Get a connection to the D-Bus session bus. It is created on first use
+    and shared by all later calls until it is lost (see
+    :py:func:`_dropLostBus`).
+
+    Connect directly to the socket instead of ``dbus.SessionBus`` if
+    ``DBUS_SESSION_BUS_ADDRESS`` is set because the ``dbus.SessionBus`` might
+    have been initiated before the environ variables were loaded and might
+    not work.
+
+    Returns:
+        dbus.bus.BusConnection: session bus connection
+    """
+    if 'DBUS_SESSION_BUS_ADDRESS' in os.environ:
+        return _busConnection(os.environ['DBUS_SESSION_BUS_ADDRESS'])
+
+    # This code may hang forever (if BiT is run as root via cron job and no
+    # user is logged in). See #1592
+    return dbus.SessionBus()
+
+
+@functools.lru_cache(maxsize=None)
+def _busConnection(address):
+    """
+    Connection to the D-Bus at ``address``, one per address and process.
+
+    Args:
+        address (str):  D-Bus address (e.g. ``unix:path=/run/user/1000/bus``)
+
+    Returns:
+        dbus.bus.BusConnection: bus connection
+    """
+    return dbus.bus.BusConnection(address)
+
+
+@functools.lru_cache(maxsize=1)
+def _systemBus():
+    """
+    Get a connection to the D-Bus system bus. It is created on first use
+    and shared by all later calls until it is lost (see
+    :py:func:`_dropLostBus`).
+
+    Returns:
+        dbus.bus.BusConnection: system bus connection
+    """
+    return dbus.SystemBus()
+
+
+# D-Bus errors raised if the connection to the bus is lost
+_DBUS_DISCONNECTED = frozenset((
+    'org.freedesktop.DBus.Error.Disconnected',
+    'org.freedesktop.DBus.Error.NoServer',
+))
+
+
+def _dropLostBus(exc, bus):
+    """
+    Drop the cached connection ``bus`` if ``exc`` was raised because it is
+    lost (e.g. the bus daemon was restarted). The next call of
+    :py:func:`_sessionBus` or :py:func:`_systemBus` connects again.
+
+    Args:
+        exc (dbus.exceptions.DBusException): error raised by a call on ``bus``
+        bus (dbus.bus.BusConnection):        connection used for that call
+
+    Returns:
+        bool: ``True`` if the connection was lost and dropped
+    """
+    if (exc.get_dbus_name() not in _DBUS_DISCONNECTED
+            and bus.get_is_connected()):
+        return False
+
+    if _systemBus.cache_info().currsize and _systemBus() is bus:
+        _systemBus.cache_clear()
+    else:
+        _busConnection.cache_clear()
+
+    # Also removes it from the shared instances of dbus.SessionBus() and
+    # dbus.SystemBus(). Otherwise they would return the lost one again.
+    bus.close()
+
+    return True
+
+
+def _onBus(connect, func):
+    """
+    Call ``func`` with the connection returned by ``connect``. If that
+    connection was lost it is dropped and ``func`` is called once more with
+    a new connection.
+
+    Args:
+        connect (callable): :py:func:`_sessionBus` or :py:func:`_systemBus`
+        func (callable):    function taking the connection as argument
+
+    Returns:
+        the return value of ``func``
+
+    Raises:
+        dbus.exceptions.DBusException: if ``func`` failed
+    """
+    bus = connect()
+
+    try:
+        return func(bus)
+    except dbus.exceptions.DBusException as exc:
+        if not _dropLostBus(exc, bus):
+            raise
+
+    return func(connect())
+
+
+# Properties interface of the UPower daemon, see _upowerProperties()
+_UPOWER_PROPERTIES = None
+
+
+def _upowerProperties():
+    """
+    Get the ``org.freedesktop.DBus.Properties`` interface of the UPower
+    daemon. Connection and proxy are created on first use and reused later.
+
+    Returns:
+        dbus.Interface: properties interface of ``/org/freedesktop/UPower``
+    """
+    global _UPOWER_PROPERTIES
+
+    if _UPOWER_PROPERTIES is None:
+        bus = _systemBus()
+        proxy = bus.get_object('org.freedesktop.UPower',
+                               '/org/freedesktop/UPower')
+        _UPOWER_PROPERTIES = dbus.Interface(
+            proxy, 'org.freedesktop.DBus.Properties')
+
+    return _UPOWER_PROPERTIES
+
+
+def _upowerCall(method, *args):
+    """
+    Call ``method`` on the cached UPower properties interface. If a cached
+    interface fails it is dropped and the call is retried once with a new
+    proxy (e.g. after the daemon was restarted). The system bus is connected
+    again, too, if its connection was lost. If there was no cached interface
+    the error is raised without a retry.
+
+    Args:
+        method (str):   name of the properties method (``Get``, ``GetAll``)
+        *args:          arguments for ``method``
+
+    Raises:
+        dbus.exceptions.DBusException: if UPower is not available or the
+                                       retry failed, too
+    """
+    global _UPOWER_PROPERTIES
+
+    was_cached = _UPOWER_PROPERTIES is not None
+
+    try:
+        return getattr(_upowerProperties(), method)(*args)
+    except dbus.exceptions.DBusException as exc:
+        _UPOWER_PROPERTIES = None
+
+        if not was_cached:
+            raise
+
+        # The cached interface implies a cached system bus
+        _dropLostBus(exc, _systemBus())
+
+    return getattr(_upowerProperties(), method)(*args)
+
 
 def powerStatusAvailable():
     """
@@ -1114,11 +1486,8 @@ def powerStatusAvailable():
     """
     if dbus:
         try:
-            bus = dbus.SystemBus()
-            proxy = bus.get_object('org.freedesktop.UPower',
-                                   '/org/freedesktop/UPower')
-            return 'OnBattery' in proxy.GetAll('org.freedesktop.UPower',
-                            dbus_interface = 'org.freedesktop.DBus.Properties')
+            return 'OnBattery' in _upowerCall('GetAll',
+                                              'org.freedesktop.UPower')
         except dbus.exceptions.DBusException:
             pass
     return False
@@ -1132,21 +1501,28 @@ def onBattery():
     """
     if dbus:
         try:
-            bus = dbus.SystemBus()
-            proxy = bus.get_object('org.freedesktop.UPower',
-                                   '/org/freedesktop/UPower')
-            return bool(proxy.Get('org.freedesktop.UPower',
-                                  'OnBattery',
-                                  dbus_interface = 'org.freedesktop.DBus.Properties'))
+            return bool(_upowerCall('Get',
+                                    'org.freedesktop.UPower',
+                                    'OnBattery'))
         except dbus.exceptions.DBusException:
             pass
     return False
 
+_RE_RSYNC_VERSION = (
+    re.compile(r'rsync\s*version\s*(\d\.\d)'),
+    re.compile(r'rsync\s*version\s*v(\d\.\d.\d)'),
+)
+_RE_RSYNC_CAPS = re.compile(r'.*Capabilities:(.+)\n\n.*', re.DOTALL)
+
+
 def rsyncCaps(data = None):
     """
     Get capabilities of the installed rsync binary. This can be different from
     version to version and also on build arguments used when building rsync.
 
+    The capabilities of the installed rsync binary are determined only once
+    per process.
+
     Args:
         data (str): 'rsync --version' output. This is just for unittests.
 
@@ -1154,22 +1530,43 @@ def rsyncCaps(data = None):
         list:       List of str with rsyncs capabilities
     """
     if not data:
-        proc = subprocess.Popen(['rsync', '--version'],
-                                stdout = subprocess.PIPE,
-                                universal_newlines = True)
-        data = proc.communicate()[0]
+        return list(_installedRsyncCaps())
+
+    return _parseRsyncCaps(data)
+
+
+@functools.lru_cache(maxsize=1)
+def _installedRsyncCaps():
+    """Cached capabilities of the installed rsync binary.
+
+    Returns:
+        tuple:      Tuple of str with rsyncs capabilities
+    """
+    proc = subprocess.Popen(['rsync', '--version'],
+                            stdout = subprocess.PIPE,
+                            universal_newlines = True)
+    data = proc.communicate()[0]
+
+    return tuple(_parseRsyncCaps(data))
+
+
+def _parseRsyncCaps(data):
+    """Extract the capabilities from 'rsync --version' output ``data``.
+
+    Returns:
+        list:       List of str with rsyncs capabilities
+    """
     caps = []
     #rsync >= 3.1 does provide --info=progress2
-    matchers = [r'rsync\s*version\s*(\d\.\d)', r'rsync\s*version\s*v(\d\.\d.\d)']
-    for matcher in matchers:
-        m = re.match(matcher, data)
+    for matcher in _RE_RSYNC_VERSION:
+        m = matcher.match(data)
         if m and Version(m.group(1)) >= Version('3.1'):
             caps.append('progress2')
             break
 
     #all other capabilities are separated by ',' between
     #'Capabilities:' and '\n\n'
-    m = re.match(r'.*Capabilities:(.+)\n\n.*', data, re.DOTALL)
+    m = _RE_RSYNC_CAPS.match(data)
     if not m:
         return caps
 
@@ -1178,6 +1575,32 @@ def rsyncCaps(data = None):
     return caps
 
 
+# Args used by rsyncPrefix() independent of the profile
+_RSYNC_STATIC_ARGS = (
+    # recurse into directories
+    '--recursive',
+    # preserve modification times
+    '--times',
+    # preserve device files (super-user only)
+    '--devices',
+    # preserve special files
+    '--specials',
+    # preserve hard links
+    '--hard-links',
+    # numbers in a human-readable format
+    '--human-readable',
+    # use "new" argument protection
+    '-s'
+)
+_RSYNC_PERMS_ARGS = (
+    '--perms',          # preserve permissions
+    '--executability',  # preserve executability
+    '--group',          # preserve group
+    '--owner'           # preserve owner (super-user only)
+)
+_RSYNC_NO_PERMS_ARGS = ('--no-perms', '--no-group', '--no-owner')
+
+
 def rsyncPrefix(config,
                 no_perms=True,
                 use_mode=['ssh', 'ssh_encfs'],
@@ -1201,7 +1624,7 @@ def rsyncPrefix(config,
         list:                   rsync command with all args but without
                                 --include, --exclude, source and destination
     """
-    caps = rsyncCaps()
+    caps = _installedRsyncCaps()
     cmd = []
 
     if config.nocacheOnLocal():
@@ -1209,22 +1632,7 @@ def rsyncPrefix(config,
 
     cmd.append('rsync')
 
-    cmd.extend((
-        # recurse into directories
-        '--recursive',
-        # preserve modification times
-        '--times',
-        # preserve device files (super-user only)
-        '--devices',
-        # preserve special files
-        '--specials',
-        # preserve hard links
-        '--hard-links',
-        # numbers in a human-readable format
-        '--human-readable',
-        # use "new" argument protection
-        '-s'
-    ))
+    cmd.extend(_RSYNC_STATIC_ARGS)
 
     if config.useChecksum() or config.forceUseChecksum:
         cmd.append('--checksum')
@@ -1249,12 +1657,9 @@ def rsyncPrefix(config,
         no_perms = False
 
     if no_perms:
-        cmd.extend(('--no-perms', '--no-group', '--no-owner'))
+        cmd.extend(_RSYNC_NO_PERMS_ARGS)
     else:
-        cmd.extend(('--perms',          # preserve permissions
-                    '--executability',  # preserve executability
-                    '--group',         # preserve group
-                    '--owner'))         # preserve owner (super-user only)
+        cmd.extend(_RSYNC_PERMS_ARGS)
 
     if progress and 'progress2' in caps:
         cmd.extend(('--info=progress2',
@@ -1354,14 +1759,21 @@ def md5sum(path):
     Returns:
         str:        md5sum of file
     """
-    md5 = hashlib.md5()
     with open(path, 'rb') as f:
-        while True:
-            data = f.read(4096)
-            if not data:
-                break
-            md5.update(data)
-    return md5.hexdigest()
+        try:
+            # Python 3.11 or newer: read and hash in C
+            return hashlib.file_digest(f, 'md5').hexdigest()
+
+        except AttributeError:
+            md5 = hashlib.md5()
+            for data in iter(lambda: f.read(1 << 20), b''):
+                md5.update(data)
+            return md5.hexdigest()
+
+
+_RE_CRON_PATTERN = re.compile(r'\*/[0-9]+|[0-9]+(?:,[0-9]+)*')
+_RE_CRON_NUMBER = re.compile(r'[0-9]+')
+
 
 def checkCronPattern(s):
     """
@@ -1380,23 +1792,11 @@ def checkCronPattern(s):
     Dev note: Schedule for removal. See comment in
     `config.Config.saveProfile()`.
     """
-    if s.find(' ') >= 0:
-        return False
-    try:
-        if s.startswith('*/'):
-            if s[2:].isdigit() and int(s[2:]) <= 24:
-                return True
-            else:
-                return False
-        for i in s.split(','):
-            if i.isdigit() and int(i) <= 24:
-                continue
-            else:
-                return False
-        return True
-    except ValueError:
+    if not _RE_CRON_PATTERN.fullmatch(s):
         return False
 
+    return all(int(i) <= 24 for i in _RE_CRON_NUMBER.findall(s))
+
 
 #TODO: check if this is still necessary
 def checkHomeEncrypt():
@@ -1416,12 +1816,22 @@ def checkHomeEncrypt():
         else:
             return True
     if checkCommand('encfs'):
-        proc = subprocess.Popen(['mount'], stdout=subprocess.PIPE, universal_newlines = True)
-        mount = proc.communicate()[0]
-        r = re.compile('^encfs on %s type fuse' % home)
-        for line in mount.split('\n'):
-            if r.match(line):
-                return True
+        # e.g. 'encfs /home/user fuse.encfs rw,nosuid,nodev 0 0'
+        try:
+            with open('/proc/self/mounts', 'r') as mounts:
+                for line in mounts:
+                    if not line.startswith('encfs '):
+                        continue
+
+                    args = line.split(' ')
+                    if (len(args) >= 3
+                            and args[2].startswith('fuse')
+                            and decodeOctalEscape(args[1]) == home):
+                        return True
+
+        except OSError as err:
+            logger.debug('Failed to read /proc/self/mounts: {}'.format(err))
+
     return False
 
 
@@ -1433,14 +1843,13 @@ def envLoad(f):
     Args:
         f (str):    full path to file with environ variables
     """
-    env = os.environ.copy()
     env_file = configfile.ConfigFile()
     env_file.load(f, maxsplit = 1)
     for key in env_file.keys():
         value = env_file.strValue(key)
         if not value:
             continue
-        if not key in list(env.keys()):
+        if key not in os.environ:
             os.environ[key] = value
     del env_file
 
@@ -1465,9 +1874,11 @@ def envSave(f):
     env_file.save(f)
 
 
+@functools.lru_cache(maxsize=1)
 def keyringSupported():
     """
-    Checks if a keyring (supported by BiT) is available
+    Checks if a keyring (supported by BiT) is available. The result is
+    cached because the backend lookup does not change while BiT is running.
 
     Returns:
          bool: ``True`` if a supported keyring could be loaded
@@ -1598,16 +2009,32 @@ def mountpoint(path):
         str:        mountpoint of the filesystem
     """
     path = os.path.realpath(os.path.abspath(path))
+    dev = None
 
+    # The mountpoint is the last folder on the way up which is on the same
+    # device as ``path``.
     while path != os.path.sep:
-        if os.path.ismount(path):
-            return path
+        parent = os.path.dirname(path)
+
+        try:
+            if dev is None:
+                dev = os.stat(path).st_dev
 
-        path = os.path.abspath(os.path.join(path, os.pardir))
+            if os.stat(parent).st_dev != dev:
+                return path
+
+        except OSError:
+            # ``path`` doesn't exist (yet). Continue with its parent.
+            dev = None
+
+        path = parent
 
     return path
 
 
+_RE_OCTAL_ESCAPE = re.compile(r'\\(\d{3})')
+
+
 def decodeOctalEscape(s):
     """
     Decode octal-escaped characters with its ASCII dependence.
@@ -1621,7 +2048,7 @@ def decodeOctalEscape(s):
     """
     def repl(m):
         return chr(int(m.group(1), 8))
-    return re.sub(r'\\(\d{3})', repl, s)
+    return _RE_OCTAL_ESCAPE.sub(repl, s)
 
 
 def mountArgs(path):
@@ -1642,17 +2069,37 @@ def mountArgs(path):
     mp = mountpoint(path)
 
     with open('/etc/mtab', 'r') as mounts:
+        content = mounts.read()
 
-        for line in mounts:
-            args = line.strip('\n').split(' ')
+    args = _mtabByMountpoint(content).get(mp)
 
-            if len(args) >= 2:
-                args[1] = decodeOctalEscape(args[1])
+    return list(args) if args else None
 
-                if args[1] == mp:
-                    return args
 
-    return None
+@functools.lru_cache(maxsize=1)
+def _mtabByMountpoint(content):
+    """
+    Parse the content of /etc/mtab into a dict. The result is cached, so as
+    long as the mount table doesn't change it is parsed only once.
+
+    Args:
+        content (str):  content of /etc/mtab
+
+    Returns:
+        dict:           decoded mountpoint as key and a tuple of all mount
+                        args of that line as value. For stacked mounts the
+                        first line wins.
+    """
+    result = {}
+
+    for line in content.split('\n'):
+        args = line.split(' ')
+
+        if len(args) >= 2:
+            args[1] = decodeOctalEscape(args[1])
+            result.setdefault(args[1], tuple(args))
+
+    return result
 
 
 def device(path):
@@ -1698,31 +2145,47 @@ def _uuidFromDev_via_filesystem(dev):
     the filesystem.
 
     Args:
-        dev (pathlib.Path): The block device path (e.g. ``/dev/sda1``).
+        dev (str): The block device path (e.g. ``/dev/sda1``).
 
     Returns:
         str: The UUID or ``None`` if nothing found.
     """
+    try:
+        # The directory mtime changes whenever a symlink is added or removed
+        mtime_ns = os.stat(DISK_BY_UUID).st_mtime_ns
+    except OSError:
+        return None
 
+    return _by_uuid_map(mtime_ns).get(dev)
 
-    # /dev/disk/by-uuid
-    path_DISK_BY_UUID = pathlib.Path(DISK_BY_UUID)
 
-    if not path_DISK_BY_UUID.exists():
-        return None
+@functools.lru_cache(maxsize=1)
+def _by_uuid_map(mtime_ns):
+    """Map each resolved block device in ``/dev/disk/by-uuid`` to its UUID.
 
-    # Each known uuid
-    for uuid_symlink in path_DISK_BY_UUID.glob('*'):
+    Args:
+        mtime_ns (int): Modification time of ``/dev/disk/by-uuid``. Only used
+            as cache key so the map is rebuilt when devices come and go.
+
+    Returns:
+        dict: Device path (e.g. ``/dev/sda1``) as key and UUID as value.
+    """
+    result = {}
 
-        # Resolve the symlink (get it's target) to get the real device name
-        # and compare it with the device we are looking for
-        if dev == uuid_symlink.resolve():
+    try:
+        with os.scandir(DISK_BY_UUID) as it:
+            for entry in it:
+                # e.g. 'c7aca0a7-89ed-43f0-a4f9-c744dfe673e0'
+                result.setdefault(os.path.realpath(entry.path), entry.name)
 
-            # e.g. 'c7aca0a7-89ed-43f0-a4f9-c744dfe673e0'
-            return uuid_symlink.name
+    except OSError as err:
+        logger.debug('Failed to read {}: {}'.format(DISK_BY_UUID, err))
 
-    # Nothing found
-    return None
+    return result
+
+
+_RE_BLKID_UUID = re.compile(r'.*\sUUID=\"([^\"]*)\".*')
+_RE_UDEVADM_UUID = re.compile(r'.*?ID_FS_UUID=(\S+)')
 
 def _uuidFromDev_via_blkid_command(dev):
     """Get the UUID for the block device ``dev`` via the extern command
@@ -1733,7 +2196,7 @@ def _uuidFromDev_via_blkid_command(dev):
         super-user (e.g. via ``sudo``).
 
     Args:
-        dev (pathlib.Path): The block device path (e.g. ``/dev/sda1``).
+        dev (str): The block device path (e.g. ``/dev/sda1``).
 
     Returns:
         str: The UUID or ``None`` if nothing found.
@@ -1750,12 +2213,11 @@ def _uuidFromDev_via_blkid_command(dev):
         return None
 
     # Parse the commands output for a UUID
-    try:
-        return re.findall(r'.*\sUUID=\"([^\"]*)\".*', output)[0]
-    except IndexError:
-        # nothing found via the regex pattern
-        pass
+    m = _RE_BLKID_UUID.search(output)
+    if m:
+        return m.group(1)
 
+    # nothing found via the regex pattern
     return None
 
 def _uuidFromDev_via_udevadm_command(dev):
@@ -1763,7 +2225,7 @@ def _uuidFromDev_via_udevadm_command(dev):
     ``udevadm``.
 
     Args:
-        dev (pathlib.Path): The block device path (e.g. ``/dev/sda1``).
+        dev (str): The block device path (e.g. ``/dev/sda1``).
 
     Returns:
         str: The UUID or ``None`` if nothing found.
@@ -1778,12 +2240,11 @@ def _uuidFromDev_via_udevadm_command(dev):
         return None
 
     # Parse the commands output for a UUID
-    try:
-        return re.findall(r'.*?ID_FS_UUID=(\S+)', output)[0]
-    except IndexError:
-        # nothing found via the regex pattern
-        pass
+    m = _RE_UDEVADM_UUID.search(output)
+    if m:
+        return m.group(1)
 
+    # nothing found via the regex pattern
     return None
 
 
@@ -1798,12 +2259,11 @@ def uuidFromDev(dev):
         str:        UUID
     """
 
-    # handle Path objects only
-    if not isinstance(dev, pathlib.Path):
-        dev = pathlib.Path(dev)
+    # handle path strings only
+    dev = os.fspath(dev)
 
-    if dev.exists():
-        dev = dev.resolve()  # when /dev/sda1 is a symlink
+    if os.path.exists(dev):
+        dev = os.path.realpath(dev)  # when /dev/sda1 is a symlink
 
         # Look at /dev/disk/by-uuid/
         uuid = _uuidFromDev_via_filesystem(dev)
@@ -1856,9 +2316,11 @@ def usingSudo():
     """
     return isRoot() and os.getenv('HOME', '/root') != '/root'
 
-re_wildcard = re.compile(r'(?:\[|\]|\?)')
-re_asterisk = re.compile(r'\*')
-re_separate_asterisk = re.compile(r'(?:^\*+[^/\*]|[^/\*]\*+[^/\*]|[^/\*]\*+|\*+[^/\*]|[^/\*]\*+$)')
+
+# Wildcards '[ ] ?' or an asterisk that is not a whole path component
+_RE_NOT_ENCRYPTABLE_WILDCARD = re.compile(
+    r'[\[\]?]|^\*+[^/\*]|[^/\*]\*+[^/\*]|[^/\*]\*+|\*+[^/\*]|[^/\*]\*+$')
+
 
 def patternHasNotEncryptableWildcard(pattern):
     """
@@ -1873,12 +2335,17 @@ def patternHasNotEncryptableWildcard(pattern):
                         ``False`` if wildcard look like
                         ``foo/*``, ``foo/*/bar``, ``*/bar`` or ``**/bar``
     """
-    if not re_wildcard.search(pattern) is None:
-        return True
+    # Most paths have no wildcards at all; skip the regex for them
+    if not any(c in pattern for c in '[]?*'):
+        return False
+
+    return _RE_NOT_ENCRYPTABLE_WILDCARD.search(pattern) is not None
 
-    if not re_asterisk is None and not re_separate_asterisk.search(pattern) is None:
-        return True
-    return False
+
+_TIME_STAMP_FORMAT_BY_LENGTH = {
+    13: '%Y%m%d %H%M',  # BIT like
+    8: '%Y%m%d',  # Anacron like
+}
 
 
 def readTimeStamp(fname):
@@ -1899,26 +2366,23 @@ def readTimeStamp(fname):
     with open(fname, 'r') as f:
         s = f.read().strip('\n')
 
-    time_formats = (
-        '%Y%m%d %H%M',  # BIT like
-        '%Y%m%d',  # Anacron like
-    )
-
-    for form in time_formats:
+    # The length of the string tells which of the formats was used
+    form = _TIME_STAMP_FORMAT_BY_LENGTH.get(len(s))
+    if form is None:
+        # invalid format
+        return
 
-        try:
-            stamp = datetime.strptime(s, form)
+    try:
+        stamp = datetime.strptime(s, form)
 
-        except ValueError:
-            # invalid format
-            # next iteration
-            pass
+    except ValueError:
+        # invalid format
+        return
 
-        else:
-            # valid time stamp
-            logger.debug(f"Read timestamp '{stamp}' from file '{fname}'")
+    # valid time stamp
+    logger.debug(f"Read timestamp '{stamp}' from file '{fname}'")
 
-            return stamp
+    return stamp
 
 
 def writeTimeStamp(fname):
@@ -1929,7 +2393,10 @@ def writeTimeStamp(fname):
     """
     now = datetime.now().strftime('%Y%m%d %H%M')
     logger.debug(f"Write timestamp '{now}' into file '{fname}'")
-    makeDirs(os.path.dirname(fname))
+
+    dirname = os.path.dirname(fname)
+    if dirname and not os.path.isdir(dirname):
+        makeDirs(dirname)
 
     with open(fname, 'w') as f:
         f.write(now)
@@ -1991,18 +2458,21 @@ def inhibitSuspend(app_id = sys.argv[0],
     except IndexError:
         toplevel_xid = 0
 
+    try:
+        _sessionBus()
+    except dbus.exceptions.DBusException:
+        logger.warning('Inhibit Suspend failed.')
+        return
+
+    def inhibit(bus):
+        interface = bus.get_object(dbus_props['service'], dbus_props['objectPath'])
+        proxy = interface.get_dbus_method(dbus_props['methodSet'], dbus_props['interface'])
+        cookie = proxy(*[(app_id, dbus.UInt32(toplevel_xid), reason, dbus.UInt32(flags))[i] for i in dbus_props['arguments']])
+        return cookie, bus
+
     for dbus_props in INHIBIT_DBUS:
         try:
-            #connect directly to the socket instead of dbus.SessionBus because
-            #the dbus.SessionBus was initiated before we loaded the environ
-            #variables and might not work
-            if 'DBUS_SESSION_BUS_ADDRESS' in os.environ:
-                bus = dbus.bus.BusConnection(os.environ['DBUS_SESSION_BUS_ADDRESS'])
-            else:
-                bus = dbus.SessionBus()  # This code may hang forever (if BiT is run as root via cron job and no user is logged in). See #1592
-            interface = bus.get_object(dbus_props['service'], dbus_props['objectPath'])
-            proxy = interface.get_dbus_method(dbus_props['methodSet'], dbus_props['interface'])
-            cookie = proxy(*[(app_id, dbus.UInt32(toplevel_xid), reason, dbus.UInt32(flags))[i] for i in dbus_props['arguments']])
+            cookie, bus = _onBus(_sessionBus, inhibit)
             logger.debug('Inhibit Suspend started. Reason: {}'.format(reason))
             return (cookie, bus, dbus_props)
         except dbus.exceptions.DBusException:
@@ -2012,10 +2482,15 @@ def inhibitSuspend(app_id = sys.argv[0],
 def unInhibitSuspend(cookie, bus, dbus_props):
     """
     Release inhibit.
+
+    Args:
+        cookie (int):                   inhibit cookie
+        bus (dbus.bus.BusConnection):   bus the inhibitor was registered on
+        dbus_props (dict):              service description from
+                                        ``INHIBIT_DBUS``
+
+    All three are returned by :py:func:`inhibitSuspend`.
     """
-    assert isinstance(cookie, int), 'cookie is not int type: %s' % cookie
-    assert isinstance(bus, dbus.bus.BusConnection), 'bus is not dbus.bus.BusConnection type: %s' % bus
-    assert isinstance(dbus_props, dict), 'dbus_props is not dict type: %s' % dbus_props
     try:
         interface = bus.get_object(dbus_props['service'], dbus_props['objectPath'])
         proxy = interface.get_dbus_method(dbus_props['methodUnSet'], dbus_props['interface'])
@@ -2048,12 +2523,24 @@ def splitCommands(cmds, head = '', tail = '', maxLength = 0):
 
         head cmds[0] cmds[n] tail
     """
+    if maxLength <= 0:
+        # Don't split
+        if cmds:
+            yield ''.join((head, *cmds, tail))
+        return
+
+    cmds = collections.deque(cmds)
+    fixed_length = len(head) + len(tail)
+
     while cmds:
-        s = head
-        while cmds and ((len(s + cmds[0] + tail) <= maxLength) or maxLength <= 0):
-            s += cmds.pop(0)
-        s += tail
-        yield s
+        parts = [head]
+        length = fixed_length
+        while cmds and length + len(cmds[0]) <= maxLength:
+            cmd = cmds.popleft()
+            length += len(cmd)
+            parts.append(cmd)
+        parts.append(tail)
+        yield ''.join(parts)
 
 
 def escapeIPv6Address(address):
@@ -2067,6 +2554,10 @@ def escapeIPv6Address(address):
     Returns:
         str: The address, escaped if it is IPv6.
     """
+    # IPv4 addresses and hostnames never contain a colon
+    if ':' not in address:
+        return address
+
     try:
         ip = ipaddress.ip_address(address)
     except ValueError:
@@ -2079,6 +2570,7 @@ def escapeIPv6Address(address):
     return address
 
 
+@functools.lru_cache(maxsize=32)
 def camelCase(s):
     """
     Remove underlines and make every first char uppercase.
@@ -2101,6 +2593,7 @@ class Alarm:
     the callback that does not support multi-threading (reentrance) or you may
     cause non-deterministic "random" RuntimeErrors (RTE).
     """
+    __slots__ = ('callback', 'ticking', 'overwrite')
 
     def __init__(self, callback=None, overwrite=True):
         """Create a new alarm instance.
@@ -2127,27 +2620,33 @@ class Alarm:
         the start is silently ignored.
 
         Args:
-            timeout: Timer count down in seconds.
+            timeout: Timer count down in seconds (fractions allowed).
         """
         if self.ticking and not self.overwrite:
             return
 
+        # Set the flag before arming the timer. Otherwise the handler may
+        # run (and reset the flag) before the flag is set, leaving it set
+        # forever.
+        self.ticking = True
+
         try:
             # Warning: This code may cause non-deterministic RunTimeError
             #          if the handler function calls code that does
             #          not support reentrance (see e.g. issue #1003).
-            signal.signal(signal.SIGALRM, self.handler)
-            signal.alarm(timeout)
+            # There is only one SIGALRM for all alarm instances. So the
+            # handler has to be (re)installed here and not in __init__().
+            if signal.getsignal(signal.SIGALRM) != self.handler:
+                signal.signal(signal.SIGALRM, self.handler)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
         except ValueError:
             # Why???
             pass
 
-        self.ticking = True
-
     def stop(self):
         """Stop timer before it comes to an end."""
         try:
-            signal.alarm(0)
+            signal.setitimer(signal.ITIMER_REAL, 0)
             self.ticking = False
 
         # TODO: What to catch?
@@ -2171,102 +2670,127 @@ class Alarm:
             self.callback()
 
 
+_RE_UNITY_VERSION = re.compile(r'unity ([\d.]+)')
+
+
+_DBUS_SHUTDOWN = {'gnome':   {'bus':          'sessionbus',
+                              'service':      'org.gnome.SessionManager',
+                              'objectPath':   '/org/gnome/SessionManager',
+                              'method':       'Shutdown',
+                                  #methods    Shutdown
+                                  #           Reboot
+                                  #           Logout
+                              'interface':    'org.gnome.SessionManager',
+                              'arguments':    ()
+                                  #arg (only with Logout)
+                                  #           0 normal
+                                  #           1 no confirm
+                                  #           2 force
+                             },
+                  'kde':     {'bus':          'sessionbus',
+                              'service':      'org.kde.ksmserver',
+                              'objectPath':   '/KSMServer',
+                              'method':       'logout',
+                              'interface':    'org.kde.KSMServerInterface',
+                              'arguments':    (-1, 2, -1)
+                                  #1st arg   -1 confirm
+                                  #           0 no confirm
+                                  #2nd arg   -1 full dialog with default logout
+                                  #           0 logout
+                                  #           1 restart
+                                  #           2 shutdown
+                                  #3rd arg   -1 wait 30sec
+                                  #           2 immediately
+                             },
+                  'xfce':    {'bus':          'sessionbus',
+                              'service':      'org.xfce.SessionManager',
+                              'objectPath':   '/org/xfce/SessionManager',
+                              'method':       'Shutdown',
+                                  #methods    Shutdown
+                                  #           Restart
+                                  #           Suspend (no args)
+                                  #           Hibernate (no args)
+                                  #           Logout (two args)
+                              'interface':    'org.xfce.Session.Manager',
+                              'arguments':    (True,)
+                                  #arg        True    allow saving
+                                  #           False   don't allow saving
+                                  #1st arg (only with Logout)
+                                  #           True    show dialog
+                                  #           False   don't show dialog
+                                  #2nd arg (only with Logout)
+                                  #           True    allow saving
+                                  #           False   don't allow saving
+                             },
+                  'mate':    {'bus':          'sessionbus',
+                              'service':      'org.mate.SessionManager',
+                              'objectPath':   '/org/mate/SessionManager',
+                              'method':       'Shutdown',
+                                  #methods    Shutdown
+                                  #           Logout
+                              'interface':    'org.mate.SessionManager',
+                              'arguments':    ()
+                                  #arg (only with Logout)
+                                  #           0 normal
+                                  #           1 no confirm
+                                  #           2 force
+                             },
+                  'e17':     {'bus':          'sessionbus',
+                              'service':      'org.enlightenment.Remote.service',
+                              'objectPath':   '/org/enlightenment/Remote/RemoteObject',
+                              'method':       'Halt',
+                                  #methods    Halt -> Shutdown
+                                  #           Reboot
+                                  #           Logout
+                                  #           Suspend
+                                  #           Hibernate
+                              'interface':    'org.enlightenment.Remote.Core',
+                              'arguments':    ()
+                             },
+                  'e19':     {'bus':          'sessionbus',
+                              'service':      'org.enlightenment.wm.service',
+                              'objectPath':   '/org/enlightenment/wm/RemoteObject',
+                              'method':       'Shutdown',
+                                  #methods    Shutdown
+                                  #           Restart
+                              'interface':    'org.enlightenment.wm.Core',
+                              'arguments':    ()
+                             },
+                  'z_freed': {'bus':          'systembus',
+                              'service':      'org.freedesktop.login1',
+                              'objectPath':   '/org/freedesktop/login1',
+                              'method':       'PowerOff',
+                              'interface':    'org.freedesktop.login1.Manager',
+                              'arguments':    (True,)
+                             }
+                 }
+
+# Freeze the table. It is shared by all ShutDown instances.
+_DBUS_SHUTDOWN = types.MappingProxyType(
+    {de: types.MappingProxyType(props)
+     for de, props in _DBUS_SHUTDOWN.items()})
+
+
 class ShutDown:
     """
     Shutdown the system after the current snapshot has finished.
     This should work for KDE, Gnome, Unity, Cinnamon, XFCE, Mate and E17.
     """
-    DBUS_SHUTDOWN ={'gnome':   {'bus':          'sessionbus',
-                                'service':      'org.gnome.SessionManager',
-                                'objectPath':   '/org/gnome/SessionManager',
-                                'method':       'Shutdown',
-                                    #methods    Shutdown
-                                    #           Reboot
-                                    #           Logout
-                                'interface':    'org.gnome.SessionManager',
-                                'arguments':    ()
-                                    #arg (only with Logout)
-                                    #           0 normal
-                                    #           1 no confirm
-                                    #           2 force
-                               },
-                    'kde':     {'bus':          'sessionbus',
-                                'service':      'org.kde.ksmserver',
-                                'objectPath':   '/KSMServer',
-                                'method':       'logout',
-                                'interface':    'org.kde.KSMServerInterface',
-                                'arguments':    (-1, 2, -1)
-                                    #1st arg   -1 confirm
-                                    #           0 no confirm
-                                    #2nd arg   -1 full dialog with default logout
-                                    #           0 logout
-                                    #           1 restart
-                                    #           2 shutdown
-                                    #3rd arg   -1 wait 30sec
-                                    #           2 immediately
-                               },
-                    'xfce':    {'bus':          'sessionbus',
-                                'service':      'org.xfce.SessionManager',
-                                'objectPath':   '/org/xfce/SessionManager',
-                                'method':       'Shutdown',
-                                    #methods    Shutdown
-                                    #           Restart
-                                    #           Suspend (no args)
-                                    #           Hibernate (no args)
-                                    #           Logout (two args)
-                                'interface':    'org.xfce.Session.Manager',
-                                'arguments':    (True,)
-                                    #arg        True    allow saving
-                                    #           False   don't allow saving
-                                    #1st arg (only with Logout)
-                                    #           True    show dialog
-                                    #           False   don't show dialog
-                                    #2nd arg (only with Logout)
-                                    #           True    allow saving
-                                    #           False   don't allow saving
-                               },
-                    'mate':    {'bus':          'sessionbus',
-                                'service':      'org.mate.SessionManager',
-                                'objectPath':   '/org/mate/SessionManager',
-                                'method':       'Shutdown',
-                                    #methods    Shutdown
-                                    #           Logout
-                                'interface':    'org.mate.SessionManager',
-                                'arguments':    ()
-                                    #arg (only with Logout)
-                                    #           0 normal
-                                    #           1 no confirm
-                                    #           2 force
-                               },
-                    'e17':     {'bus':          'sessionbus',
-                                'service':      'org.enlightenment.Remote.service',
-                                'objectPath':   '/org/enlightenment/Remote/RemoteObject',
-                                'method':       'Halt',
-                                    #methods    Halt -> Shutdown
-                                    #           Reboot
-                                    #           Logout
-                                    #           Suspend
-                                    #           Hibernate
-                                'interface':    'org.enlightenment.Remote.Core',
-                                'arguments':    ()
-                               },
-                    'e19':     {'bus':          'sessionbus',
-                                'service':      'org.enlightenment.wm.service',
-                                'objectPath':   '/org/enlightenment/wm/RemoteObject',
-                                'method':       'Shutdown',
-                                    #methods    Shutdown
-                                    #           Restart
-                                'interface':    'org.enlightenment.wm.Core',
-                                'arguments':    ()
-                               },
-                    'z_freed': {'bus':          'systembus',
-                                'service':      'org.freedesktop.login1',
-                                'objectPath':   '/org/freedesktop/login1',
-                                'method':       'PowerOff',
-                                'interface':    'org.freedesktop.login1.Manager',
-                                'arguments':    (True,)
-                               }
-                   }
+    __slots__ = ('is_root', 'proxy', 'args', 'activate_shutdown', 'started')
+
+    DBUS_SHUTDOWN = _DBUS_SHUTDOWN
+
+    # Order in which the services in DBUS_SHUTDOWN are tried. Sorted once
+    # here. The systemd login manager ('z_freed') is the last resort.
+    DE_ORDER = tuple(sorted(_DBUS_SHUTDOWN))
+
+    # Desktop names in XDG_CURRENT_DESKTOP (lower case) and the related
+    # DBUS_SHUTDOWN key
+    XDG_CURRENT_DESKTOP = {'gnome':         'gnome',
+                           'kde':           'kde',
+                           'xfce':          'xfce',
+                           'mate':          'mate',
+                           'enlightenment': 'e19'}
 
     def __init__(self):
         self.is_root = isRoot()
@@ -2283,31 +2807,53 @@ class ShutDown:
         return a callable dbus proxy and those arguments.
         """
         try:
-            if 'DBUS_SESSION_BUS_ADDRESS' in os.environ:
-                sessionbus = dbus.bus.BusConnection(os.environ['DBUS_SESSION_BUS_ADDRESS'])
-            else:
-                sessionbus = dbus.SessionBus()
-            systembus  = dbus.SystemBus()
+            _sessionBus()
+            _systemBus()
         except:
             return (None, None)
-        des = list(self.DBUS_SHUTDOWN.keys())
-        des.sort()
+        des = self.DE_ORDER
+
+        # Try the running desktop environment first
+        current_de = self._currentDesktop()
+        if current_de:
+            des = (current_de, ) + tuple(de for de in des if de != current_de)
+
         for de in des:
             if de == 'gnome' and self.unity7():
                 continue
             dbus_props = self.DBUS_SHUTDOWN[de]
-            try:
-                if dbus_props['bus'] == 'sessionbus':
-                    bus = sessionbus
-                else:
-                    bus = systembus
+            if dbus_props['bus'] == 'sessionbus':
+                connect = _sessionBus
+            else:
+                connect = _systemBus
+
+            def get_method(bus):
                 interface = bus.get_object(dbus_props['service'], dbus_props['objectPath'])
-                proxy = interface.get_dbus_method(dbus_props['method'], dbus_props['interface'])
+                return interface.get_dbus_method(dbus_props['method'], dbus_props['interface'])
+
+            try:
+                proxy = _onBus(connect, get_method)
                 return (proxy, dbus_props['arguments'])
             except dbus.exceptions.DBusException:
                 continue
         return (None, None)
 
+    def _currentDesktop(self):
+        """
+        Determine the running desktop environment via XDG_CURRENT_DESKTOP.
+
+        Returns:
+            str:    key in ``DBUS_SHUTDOWN`` or ``None`` if unknown
+        """
+        # e.g. 'ubuntu:GNOME'
+        desktops = os.environ.get('XDG_CURRENT_DESKTOP', '').lower()
+
+        for name in desktops.split(':'):
+            if name in self.XDG_CURRENT_DESKTOP:
+                return self.XDG_CURRENT_DESKTOP[name]
+
+        return None
+
     def canShutdown(self):
         """
         Indicate if a valid dbus service is available to shutdown system.
@@ -2354,7 +2900,7 @@ class ShutDown:
                                 stdout = subprocess.PIPE,
                                 universal_newlines = True)
         unity_version = proc.communicate()[0]
-        m = re.match(r'unity ([\d\.]+)', unity_version)
+        m = _RE_UNITY_VERSION.match(unity_version)
 
         return m and Version(m.group(1)) >= Version('7.0') and processExists('unity-panel-service')
 
@@ -2370,16 +2916,43 @@ class SetupUdev:
     INTERFACE = 'net.launchpad.backintime.serviceHelper.UdevRules'
     MEMBERS = ('addRule', 'save', 'delete')
 
+    __slots__ = ('_iface', '_connected')
+
     def __init__(self):
-        if dbus is None:
-            self.isReady = False
+        # The D-Bus connection to serviceHelper.py is established on first
+        # use. See `iface`.
+        self._iface = None
+        self._connected = None
+
+    @property
+    def iface(self):
+        """D-Bus interface of serviceHelper.py or ``None`` if it is not
+        available. Connects on first access.
+        """
+        if self._connected is None:
+            self._connected = self._connect()
 
-            return
+        return self._iface
+
+    @property
+    def isReady(self):
+        """``True`` if serviceHelper.py is available via D-Bus."""
+        return self.iface is not None
+
+    def _connect(self):
+        """Connect to serviceHelper.py via D-Bus.
+
+        Returns:
+            bool: ``True`` on success.
+        """
+        if dbus is None:
+            return False
 
         try:
-            bus = dbus.SystemBus()
-            conn = bus.get_object(SetupUdev.CONNECTION, SetupUdev.OBJECT)
-            self.iface = dbus.Interface(conn, SetupUdev.INTERFACE)
+            conn = _onBus(_systemBus,
+                          lambda bus: bus.get_object(SetupUdev.CONNECTION,
+                                                     SetupUdev.OBJECT))
+            self._iface = dbus.Interface(conn, SetupUdev.INTERFACE)
 
         except dbus.exceptions.DBusException as e:
             # Only DBusExceptions are  handled to do a "graceful recovery"
@@ -2399,7 +2972,7 @@ class SetupUdev:
             # else:
             #     raise
 
-        self.isReady = bool(conn)
+        return bool(conn)
 
     def addRule(self, cmd, uuid):
         """Prepare rules in serviceHelper.py
@@ -2452,13 +3025,16 @@ class SetupUdev:
 
 
 class PathHistory:
+    __slots__ = ('history', 'index')
+
     def __init__(self, path):
         self.history = [path,]
         self.index = 0
 
     def append(self, path):
         #append path after the current index
-        self.history = self.history[:self.index + 1] + [path,]
+        del self.history[self.index + 1:]
+        self.history.append(path)
         self.index = len(self.history) - 1
 
     def previous(self):
@@ -2486,6 +3062,59 @@ class PathHistory:
         self.index = 0
 
 
+# Execute instance whose command gets the signals SIGTSTP, SIGCONT and SIGHUP
+# forwarded and the handlers of these signals installed before forwarding.
+# See _forwardSignal().
+_SIGNAL_FORWARD_TARGET = None
+_SIGNAL_HANDLERS_BEFORE_FORWARDING = {}
+
+
+def _forwardSignal(signum, frame):
+    """Signal handler forwarding ``SIGTSTP``, ``SIGCONT`` and ``SIGHUP`` to
+    the command of the currently running :py:class:`Execute` instance.
+
+    If no command is running the signal is handled like it was before the
+    forwarding was installed.
+    """
+    target = _SIGNAL_FORWARD_TARGET
+
+    if target is not None:
+        if signum == signal.SIGTSTP:
+            target.pause(signum, frame)
+        elif signum == signal.SIGCONT:
+            target.resume(signum, frame)
+        else:
+            target.kill(signum, frame)
+
+        return
+
+    previous = _SIGNAL_HANDLERS_BEFORE_FORWARDING.get(signum)
+
+    if callable(previous):
+        previous(signum, frame)
+
+    elif previous != signal.SIG_IGN:
+        # Default action (e.g. stop the process on SIGTSTP)
+        signal.signal(signum, signal.SIG_DFL)
+        signal.raise_signal(signum)
+        signal.signal(signum, _forwardSignal)
+
+
+def _installSignalForwarding():
+    """Install :py:func:`_forwardSignal` as handler for ``SIGTSTP``,
+    ``SIGCONT`` and ``SIGHUP`` if not done already.
+
+    Raises:
+        ValueError: If not called from the main thread.
+    """
+    for signum in (signal.SIGTSTP, signal.SIGCONT, signal.SIGHUP):
+        current = signal.getsignal(signum)
+
+        if current is not _forwardSignal:
+            _SIGNAL_HANDLERS_BEFORE_FORWARDING[signum] = current
+            signal.signal(signum, _forwardSignal)
+
+
 class Execute:
     """Execute external commands and handle its output.
 
@@ -2511,6 +3140,10 @@ class Execute:
         main process will be forwarded to the command. ``SIGHUP`` will kill
         the process.
     """
+    __slots__ = ('cmd', 'callback', 'user_data', 'filters', 'currentProc',
+                 'conv_str', 'join_stderr', 'parent', 'pausable',
+                 '_printable_cmd')
+
     def __init__(self,
                  cmd,
                  callback=None,
@@ -2526,6 +3159,7 @@ class Execute:
         self.currentProc = None
         self.conv_str = conv_str
         self.join_stderr = join_stderr
+        self._printable_cmd = None
         # Need to forward parent to have the correct class name in debug log.
         self.parent = parent if parent else self
 
@@ -2544,8 +3178,18 @@ class Execute:
                 '<bit-dev-join@python.org>.')
 
         self.pausable = True
-        self.printable_cmd = ' '.join(self.cmd)
-        logger.debug(f'Call command "{self.printable_cmd}"', self.parent, 2)
+
+        if logger.DEBUG:
+            logger.debug(
+                f'Call command "{self.printable_cmd}"', self.parent, 2)
+
+    @property
+    def printable_cmd(self):
+        """The command as one string. Only built when it is logged."""
+        if self._printable_cmd is None:
+            self._printable_cmd = ' '.join(self.cmd)
+
+        return self._printable_cmd
 
     def run(self):
         """Run the command using ``subprocess.Popen``.
@@ -2553,8 +3197,9 @@ class Execute:
         Returns:
             int: Code from the command.
         """
+        global _SIGNAL_FORWARD_TARGET
+
         ret_val = 0
-        out = ''
 
         try:
             # register signals for pause, resume and kill
@@ -2562,85 +3207,149 @@ class Execute:
             # normally) to the child process ("rsync" normally).
             # Note: SIGSTOP (unblockable stop) cannot be forwarded because
             # it cannot be caught in a signal handler!
-            signal.signal(signal.SIGTSTP, self.pause)
-            signal.signal(signal.SIGCONT, self.resume)
-            signal.signal(signal.SIGHUP, self.kill)
+            _installSignalForwarding()
 
         except ValueError:
             # signal only work in qt main thread
             # TODO What does this imply?
             pass
 
-        stderr = subprocess.STDOUT if self.join_stderr else subprocess.DEVNULL
-
-        logger.debug(f"Starting command '{self.printable_cmd}'")
+        previous_target = _SIGNAL_FORWARD_TARGET
+        _SIGNAL_FORWARD_TARGET = self
 
-        self.currentProc = subprocess.Popen(
-            self.cmd, stdout=subprocess.PIPE, stderr=stderr)
-
-        # # TEST code for developers to simulate a killed rsync process
-        # if self.printable_cmd.startswith("rsync --recursive"):
-        #     self.currentProc.terminate()  # signal 15 (SIGTERM) like "killall" and "kill" do by default
-        #     # self.currentProc.send_signal(signal.SIGHUP)  # signal 1
-        #     # self.currentProc.kill()  # signal 9
-        #     logger.error("rsync killed for testing purposes during development")
+        stderr = subprocess.STDOUT if self.join_stderr else subprocess.DEVNULL
 
-        if self.callback:
+        if logger.DEBUG:
+            logger.debug(f"Starting command '{self.printable_cmd}'")
 
-            for line in self.currentProc.stdout:
+        try:
+            # Keep stdout as PIPE even without a callback. Its content is
+            # added to the log message about the return code at the end.
+            self.currentProc = subprocess.Popen(
+                self.cmd, stdout=subprocess.PIPE, stderr=stderr)
 
-                if self.conv_str:
-                    line = line.decode().rstrip('\n')
-                else:
-                    line = line.rstrip(b'\n')
+            # # TEST code for developers to simulate a killed rsync process
+            # if self.printable_cmd.startswith("rsync --recursive"):
+            #     self.currentProc.terminate()  # signal 15 (SIGTERM) like "killall" and "kill" do by default
+            #     # self.currentProc.send_signal(signal.SIGHUP)  # signal 1
+            #     # self.currentProc.kill()  # signal 9
+            #     logger.error("rsync killed for testing purposes during development")
 
-                for f in self.filters:
-                    line = f(line)
+            if self.callback:
+                apply_filters = self._composeFilters()
 
-                if not line:
-                    continue
+                for line in self._readLines(self.currentProc.stdout):
 
-                self.callback(line, self.user_data)
+                    if apply_filters:
+                        line = apply_filters(line)
 
-        # We use communicate() instead of wait() to avoid a deadlock
-        # when stdout=PIPE and/or stderr=PIPE and the child process
-        # generates enough output to pipe that it blocks waiting for
-        # free buffer. See also:
-        # https://docs.python.org/3.10/library/subprocess.html#subprocess.Popen.wait
-        out = self.currentProc.communicate()[0]
+                    if not line:
+                        continue
 
-        # TODO Why is "out" empty instead of containing all stdout?
-        #      Most probably because Popen was called with a PIPE as stdout
-        #      to directly process each stdout line by calling the callback...
+                    self.callback(line, self.user_data)
 
-        ret_val = self.currentProc.returncode
-        # TODO ret_val is sometimes 0 instead of e.g. 23 for rsync. Why?
+                # stdout was read until EOF above. So wait() can't deadlock.
+                self.currentProc.stdout.close()
+                self.currentProc.wait()
+                out = b''
 
-        try:
-            # reset signal handler to their default
-            signal.signal(signal.SIGTSTP, signal.SIG_DFL)
-            signal.signal(signal.SIGCONT, signal.SIG_DFL)
-            signal.signal(signal.SIGHUP, signal.SIG_DFL)
-        except ValueError:
-            # signal only work in qt main thread
-            # TODO What does this imply?
-            pass
+            else:
+                # We use communicate() instead of wait() to avoid a deadlock
+                # when stdout=PIPE and/or stderr=PIPE and the child process
+                # generates enough output to pipe that it blocks waiting for
+                # free buffer. See also:
+                # https://docs.python.org/3.10/library/subprocess.html#subprocess.Popen.wait
+                out = self.currentProc.communicate()[0]
+
+            ret_val = self.currentProc.returncode
+            # TODO ret_val is sometimes 0 instead of e.g. 23 for rsync. Why?
+
+        finally:
+            # Also restore the target if Popen() failed (e.g. command not
+            # found). The handlers stay installed. Without a target they
+            # behave like the handlers installed before them.
+            _SIGNAL_FORWARD_TARGET = previous_target
 
         if ret_val == 0:
-            msg = f'Command "{self.printable_cmd[:16]}" returns {ret_val}'
-            if out:
-                msg += ': ' + out.decode().strip('\n')
-            logger.debug(msg, self.parent, 2)
+            if logger.DEBUG:
+                msg = f'Command "{self.printable_cmd[:16]}" returns {ret_val}'
+                if out:
+                    msg += ': ' + out.decode(errors='replace').strip('\n')
+                logger.debug(msg, self.parent, 2)
 
         else:
             msg = f'Command "{self.printable_cmd}" ' \
                   f'returns {bcolors.WARNING}{ret_val}{bcolors.ENDC}'
             if out:
-                msg += ' | ' + out.decode().strip('\n')
+                msg += ' | ' + out.decode(errors='replace').strip('\n')
             logger.warning(msg, self.parent, 2)
 
         return ret_val
 
+    def _composeFilters(self):
+        """Combine ``self.filters`` into one function, so that each line of
+        output needs only one call.
+
+        Returns:
+            callable: Function applying all filters in order or ``None`` if
+                there are no filters.
+        """
+        filters = tuple(self.filters)
+
+        if not filters:
+            return None
+
+        if len(filters) == 1:
+            return filters[0]
+
+        def apply_filters(line):
+            for f in filters:
+                line = f(line)
+            return line
+
+        return apply_filters
+
+    def _readLines(self, pipe):
+        """Read ``pipe`` in large chunks and yield its lines without line
+        endings. Splitting (and UTF-8 decoding if ``conv_str`` is set) is done
+        once per chunk instead of once per line.
+
+        Args:
+            pipe (io.BufferedReader): stdout of the command.
+
+        Yields:
+            str or bytes: One line of output.
+        """
+        fd = pipe.fileno()
+        tail = b''
+
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+
+            data = tail + chunk
+            end = data.rfind(b'\n')
+            if end < 0:
+                # No complete line yet
+                tail = data
+                continue
+
+            tail = data[end + 1:]
+            data = data[:end]
+
+            # A '\n' byte is never part of a multibyte UTF-8 sequence, so
+            # decoding complete lines at once is safe. Invalid bytes (e.g. in
+            # file names) are replaced instead of aborting the command.
+            if self.conv_str:
+                yield from data.decode(errors='replace').split('\n')
+            else:
+                yield from data.split(b'\n')
+
+        # Last line without line ending
+        if tail:
+            yield tail.decode(errors='replace') if self.conv_str else tail
+
     def pause(self, signum, frame):
         """Slot which will send ``SIGSTOP`` to the command. Is connected to
         signal ``SIGTSTP``.
@@ -57,7 +57,9 @@
 # --- End of MIT License permission notice ---
 import os
 import re
-from subprocess import Popen, PIPE
+import shutil
+import string
+import functools
 try:
     import pwd
 except ImportError:
@@ -75,6 +77,21 @@ from PyQt6.QtCore import QCoreApplication
 UDEV_RULES_PATH = '/etc/udev/rules.d/99-backintime-%s.rules'
 
 
+# Characters allowed in addRule() arguments
+_UUID_CHARS = frozenset(string.ascii_letters + string.digits + '-')
+_CMD_CHARS = _UUID_CHARS | frozenset('/.>& ')
+
+# Allowed switches of the commands whitelisted in _validateCmd()
+_RE_NICE_SWITCHES = re.compile(r'^-n')
+_RE_IONICE_SWITCHES = re.compile(r'(^-c|^-n)')
+
+
+@functools.lru_cache(maxsize=None)
+def _resolveExecutable(exe):
+    """Full path of ``exe`` in 'PATH' or ``None``."""
+    return shutil.which(exe)
+
+
 class InvalidChar(dbus.DBusException):
     _dbus_error_name = 'net.launchpad.backintime.InvalidChar'
 
@@ -101,60 +118,70 @@ class UdevRules(dbus.service.Object):
 
         self.tmpDict = {}
 
+        # Unix user and name owner of D-Bus senders (see _senderInfo).
+        # Entries are dropped when the sender disconnects from the bus.
+        self.senderCache = {}
+        if conn is not None:
+            conn.add_signal_receiver(self._nameOwnerChanged,
+                                     signal_name='NameOwnerChanged',
+                                     dbus_interface='org.freedesktop.DBus',
+                                     bus_name='org.freedesktop.DBus',
+                                     path='/org/freedesktop/DBus')
+
         # find su path
         self.su = self._which('su', '/bin/su')
         self.backintime = self._which('backintime', '/usr/bin/backintime')
         self.nice = self._which('nice', '/usr/bin/nice')
         self.ionice = self._which('ionice', '/usr/bin/ionice')
+
+        # well known commands and their switches allowed in front of
+        # backintime (see _validateCmd)
+        self.whitelist = (
+            (self.nice, _RE_NICE_SWITCHES),
+            (self.ionice, _RE_IONICE_SWITCHES),
+        )
+
         self.max_rules = 100
         self.max_users = 20
         self.max_cmd_len = 120  # was 100 before but was too small (see #1027)
 
     def _which(self, exe, fallback):
-        proc = Popen(['which', exe], stdout=PIPE)
-        ret = proc.communicate()[0].strip().decode()
-        if proc.returncode or not ret:
-            return fallback
-
-        return ret
+        return _resolveExecutable(exe) or fallback
 
     def _validateCmd(self, cmd):
 
-        if cmd.find("&&") != -1:
+        if '&&' in cmd:
             raise InvalidCmd("Parameter 'cmd' contains '&&' concatenation")
         # make sure it starts with an absolute path
-        elif not cmd.startswith(os.path.sep):
+        elif cmd[:1] != os.path.sep:
             raise InvalidCmd("Parameter 'cmd' does not start with '/'")
 
         parts = cmd.split()
+        count = len(parts)
+        i = 0
 
         # make sure only well known commands and switches are used
-        whitelist = (
-            (self.nice, r'^-n'),
-            (self.ionice, r'(^-c|^-n)'),
-        )
-
-        while parts:
-            for c, switches in whitelist:
-                if parts[0] == c:
-                    parts.pop(0)
-                    while parts and re.match(switches, parts[0]):
-                        parts.pop(0)
+        while i < count:
+            for c, switches in self.whitelist:
+                if parts[i] == c:
+                    i += 1
+                    while i < count and switches.match(parts[i]):
+                        i += 1
                     break
             else:
                 break
 
-        if not parts:
+        if i == count:
             raise InvalidCmd(
                 "Parameter 'cmd' does not contain the backintime command")
 
-        elif parts[0] != self.backintime:
+        elif parts[i] != self.backintime:
             raise InvalidCmd("Parameter 'cmd' contains non-whitelisted "
-                             f"cmd/parameter ({parts[0]})")
+                             f"cmd/parameter ({parts[i]})")
 
     def _checkLimits(self, owner, cmd):
 
-        if len(self.tmpDict.get(owner, [])) >= self.max_rules:
+        if len(self.tmpDict.get(owner, ())) >= self.max_rules:
             raise LimitExceeded("Maximum number of cached rules reached (%d)"
                             % self.max_rules)
 
@@ -176,34 +203,29 @@ class UdevRules(dbus.service.Object):
         run as root.
         """
         # prevent breaking out of su command
-        chars = re.findall(r'[^a-zA-Z0-9-/\.>& ]', cmd)
+        chars = set(cmd) - _CMD_CHARS
         if chars:
             raise InvalidChar("Parameter 'cmd' contains invalid character(s) %s"
-                              % '|'.join(set(chars)))
+                              % '|'.join(chars))
         # only allow relevant chars in uuid
-        chars = re.findall(r'[^a-zA-Z0-9-]', uuid)
+        chars = set(uuid) - _UUID_CHARS
         if chars:
             raise InvalidChar("Parameter 'uuid' contains invalid character(s) %s"
-                              % '|'.join(set(chars)))
+                              % '|'.join(chars))
 
         self._validateCmd(cmd)
 
-        info = SenderInfo(sender, conn)
-        user = info.connectionUnixUser()
-        owner = info.nameOwner()
+        user, owner = self._senderInfo(sender, conn)
 
         self._checkLimits(owner, cmd)
 
         #create su command
-        sucmd = "%s - '%s' -c '%s'" %(self.su, user, cmd)
+        sucmd = f"{self.su} - '{user}' -c '{cmd}'"
         #create Udev rule
-        rule = 'ACTION=="add|change", ENV{ID_FS_UUID}=="%s", RUN+="%s"\n' %(uuid, sucmd)
+        rule = f'ACTION=="add|change", ENV{{ID_FS_UUID}}=="{uuid}", RUN+="{sucmd}"\n'
 
         #store rule
-        if not owner in self.tmpDict:
-            self.tmpDict[owner] = []
-
-        self.tmpDict[owner].append(rule)
+        self.tmpDict.setdefault(owner, []).append(rule)
 
     @dbus.service.method("net.launchpad.backintime.serviceHelper.UdevRules",
                          in_signature='', out_signature='b',
@@ -215,27 +237,51 @@ class UdevRules(dbus.service.Object):
         temporary added rules and current rules in destination file.
         Returns False if files are identical or no rules to be installed.
         """
-        info = SenderInfo(sender, conn)
-        user = info.connectionUnixUser()
-        owner = info.nameOwner()
+        user, owner = self._senderInfo(sender, conn)
 
         #delete rule if no rules in tmp
         if not owner in self.tmpDict or not self.tmpDict[owner]:
             self.delete(sender, conn)
             return False
 
+        path = UDEV_RULES_PATH % user
+        rules = ''.join(self.tmpDict[owner]).encode()
+
         #return False if rule already exist.
-        if os.path.exists(UDEV_RULES_PATH % user):
-            with open(UDEV_RULES_PATH % user, 'r') as f:
-                if self.tmpDict[owner] == f.readlines():
-                    self._clean(owner)
-                    return False
+        #Only read the current file if its size matches.
+        try:
+            if os.stat(path).st_size == len(rules):
+                with open(path, 'rb') as f:
+                    if f.read() == rules:
+                        self._clean(owner)
+                        return False
+
+        except FileNotFoundError:
+            pass
 
         #auth to save changes
         self._checkPolkitPrivilege(sender, conn, 'net.launchpad.backintime.UdevRuleSave')
 
-        with open(UDEV_RULES_PATH % user, 'w') as f:
-            f.writelines(self.tmpDict[owner])
+        # Write all rules to a temporary file first and rename it over the
+        # destination, so udev never sees a truncated or partial file. The
+        # file is small (limited by max_rules and max_cmd_len).
+        tmp = path + '.tmp'
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            try:
+                view = memoryview(rules)
+                while view:
+                    view = view[os.write(fd, view):]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
 
         self._clean(owner)
 
@@ -248,9 +294,7 @@ class UdevRules(dbus.service.Object):
         """
         Delete existing Udev rule
         """
-        info = SenderInfo(sender, conn)
-        user = info.connectionUnixUser()
-        owner = info.nameOwner()
+        user, owner = self._senderInfo(sender, conn)
         self._clean(owner)
 
         if os.path.exists(UDEV_RULES_PATH % user):
@@ -265,8 +309,31 @@ class UdevRules(dbus.service.Object):
         """
         clean up previous cached rules
         """
+        _, owner = self._senderInfo(sender, conn)
+        self._clean(owner)
+
+    def _senderInfo(self, sender, conn):
+        """
+        Unix user and name owner of D-Bus ``sender``. Both can't change
+        while the sender is connected, so they are looked up only once.
+        """
+        try:
+            return self.senderCache[sender]
+        except KeyError:
+            pass
+
         info = SenderInfo(sender, conn)
-        self._clean(info.nameOwner())
+        result = (info.connectionUnixUser(), info.nameOwner())
+
+        if sender is not None:
+            self.senderCache[sender] = result
+
+        return result
+
+    def _nameOwnerChanged(self, name, old_owner, new_owner):
+        # An empty new owner means that the name is gone (disconnected)
+        if not new_owner:
+            self.senderCache.pop(name, None)
 
     def _clean(self, owner):
         if owner in self.tmpDict: